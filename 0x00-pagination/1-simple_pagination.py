@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
-import csv
 import math
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from dataset_source import DatasetSource
+from prefetch import prefetched
 
 index_range = __import__("0-simple_helper_function").index_range
 
@@ -10,17 +12,27 @@ class Server:
     """Server class to paginate a database of popular baby names."""
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
-        self.__dataset = None
+    def __init__(self, mode: str = "eager", workers: Optional[int] = 1,
+                 watch: Optional[float] = None,
+                 data_file: Union[str, Sequence[str], None] = None):
+        """Create a server; ``mode`` and ``workers`` select how the CSV
+        is loaded (see ``dataset_loader.load_dataset``). With ``watch``
+        set, the file is checked for changes at most every ``watch``
+        seconds and followed (see ``dataset_source.DatasetSource``).
+
+        ``data_file`` replaces ``DATA_FILE``; a list of files is served
+        as one dataset, each file parsed only once a page reaches it
+        (see ``sharded_dataset.ShardedDataset``)."""
+        self.__source = DatasetSource(data_file or self.DATA_FILE, mode,
+                                      workers, watch)
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Cached dataset."""
-        if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]  # Skip the header row
-        return self.__dataset
+        return self.__source.current()
+
+    def source(self) -> DatasetSource:
+        """The source following the data file(s)."""
+        return self.__source
 
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """Get a page of the dataset."""
@@ -40,3 +52,26 @@ class Server:
             return []  # If start_index is out of range, return an empty list
 
         return dataset[start_index:end_index]
+
+    def iter_pages(
+        self, page_size: int = 10, start: int = 1, prefetch: int = 2
+    ) -> Iterator[List[List]]:
+        """Lazily yield pages from ``start`` until the dataset ends.
+
+        The next ``prefetch`` pages are fetched on a background thread
+        while the current one is processed; prefetching stops as soon
+        as the caller stops iterating.
+        """
+        assert isinstance(start, int), "start must be an integer"
+        assert start > 0, "start must be a positive integer"
+
+        def pages() -> Iterator[List[List]]:
+            page = start
+            while True:
+                data = self.get_page(page, page_size)
+                if not data:
+                    return
+                yield data
+                page += 1
+
+        return prefetched(pages(), prefetch)
@@ -1,37 +1,167 @@
 #!/usr/bin/env python3
 """Module for paginating a dataset of popular baby names. """
-import csv
 import math
-from typing import List, Tuple, Dict, Any
+from typing import (TYPE_CHECKING, Iterator, List, Optional, Sequence,
+                    Tuple, Dict, Any, Union)
+
+from cursor import decode_cursor, encode_cursor, seek_after
+from dataset_loader import take_rows
+from dataset_source import DatasetSource
+from json_rows import EncodedRows, EncodedRowsCache, dumps_page
+from page_cache import PageCache
+from prefetch import prefetched
+from prefix_index import PrefixIndex
+from secondary_index import SecondaryIndex
+
+if TYPE_CHECKING:
+    from aggregates import Aggregates  # Imports NumPy
 
 
 index_range = __import__("0-simple_helper_function").index_range
 
 
+def _check_page(page: int, page_size: int) -> None:
+    """Assert that ``page`` and ``page_size`` are positive integers."""
+    assert isinstance(page, int), "page must be an integer"
+    assert page > 0, "page must be a positive integer"
+    assert isinstance(page_size, int), "page_size must be an integer"
+    assert page_size > 0, "page_size must be a positive integer"
+
+
+def _envelope(page: int, page_size: int, data: Sequence,
+              total_items: int) -> Dict[str, Any]:
+    """The hypermedia envelope of ``data``, page ``page`` of
+    ``total_items`` items."""
+    total_pages = math.ceil(total_items / page_size)
+    return {
+        "page_size": len(data),
+        "page": page,
+        "data": data,
+        "next_page": page + 1 if page < total_pages else None,
+        "prev_page": page - 1 if page > 1 else None,
+        "total_pages": total_pages
+    }
+
+
 class Server:
     """Server class to paginate a database of popular baby names."""
     DATA_FILE = "Popular_Baby_Names.csv"
+    COLUMNS = ("year", "gender", "ethnicity", "name", "count", "rank")
+    FILTERABLE = ("year", "gender", "ethnicity", "name")
+    SORTABLE = ("year", "name", "count", "rank")
+
+    def __init__(self, mode: str = "eager", workers: Optional[int] = 1,
+                 watch: Optional[float] = None,
+                 data_file: Union[str, Sequence[str], None] = None,
+                 page_cache: Optional[PageCache] = None,
+                 source: Optional[DatasetSource] = None):
+        """Create a server; ``mode`` and ``workers`` select how the CSV
+        is loaded (see ``dataset_loader.load_dataset``). With ``watch``
+        set, the file is checked for changes at most every ``watch``
+        seconds and followed (see ``dataset_source.DatasetSource``).
+
+        ``data_file`` replaces ``DATA_FILE``; a list of files is served
+        as one dataset, each file parsed only once a page reaches it
+        (see ``sharded_dataset.ShardedDataset``).
 
-    def __init__(self):
-        self.__dataset = None
+        ``page_cache`` (e.g. ``PageCache("LFU", 256)``) caches page
+        results; see ``page_cache()``.
 
-    def dataset(self) -> List[List]:
+        ``source`` shares the dataset of another server (see
+        ``source()``) instead of loading the file again; the loading
+        arguments are then ignored."""
+        self.__source = source or DatasetSource(
+            data_file or self.DATA_FILE, mode, workers, watch)
+        self.__page_cache = page_cache
+        self.__secondary_index = (None, None)  # (index, generation)
+        self.__json_rows = EncodedRowsCache()
+        self.__prefix_index = (None, None)     # (index, generation)
+        self.__aggregates = (None, None)       # (aggregates, generation)
+
+    def dataset(self) -> Sequence[List]:
         """Cached dataset."""
-        if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]  # Skip the header row
-        return self.__dataset
-
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
-        """Get a page of the dataset."""
-        assert isinstance(page, int), "page must be an integer"
-        assert page > 0, "page must be a positive integer"
-        assert isinstance(page_size, int), "page_size must be an integer"
-        assert page_size > 0, "page_size must be a positive integer"
+        return self.__source.current()
+
+    def page_cache(self) -> Optional[PageCache]:
+        """The page result cache, if enabled; ``stats()`` gives its hit
+        ratio."""
+        return self.__page_cache
+
+    def source(self) -> DatasetSource:
+        """The source following the data file(s)."""
+        return self.__source
+
+    def secondary_index(self) -> SecondaryIndex:
+        """Cached posting lists and sort permutations over the dataset.
+
+        Rows appended to the file are merged into the cached index; a
+        reloaded file is indexed again.
+        """
+        return self._secondary_index_state()[0]
+
+    def _secondary_index_state(self) -> Tuple[SecondaryIndex, int]:
+        """The secondary index and the dataset generation it covers."""
+        dataset, generation = self.__source.state()
+        index, index_generation = self.__secondary_index
+        if index is None or generation != index_generation:
+            index = SecondaryIndex(
+                dataset, self.COLUMNS, self.FILTERABLE, self.SORTABLE
+            )
+        elif index.dataset is not dataset:
+            index = index.extended(dataset)
+        self.__secondary_index = (index, generation)
+        return index, generation
+
+    def prefix_index(self) -> PrefixIndex:
+        """Cached name-prefix index, rebuilt when the dataset changes."""
+        dataset, generation = self.__source.state()
+        index, index_generation = self.__prefix_index
+        if index is None or index.dataset is not dataset or \
+                index_generation != generation:
+            index = PrefixIndex(dataset, self.COLUMNS.index("name"),
+                                self.COLUMNS.index("count"))
+            self.__prefix_index = (index, generation)
+        return index
+
+    def aggregates(self) -> "Aggregates":
+        """Cached aggregate query layer for the current dataset.
+
+        Requires NumPy, which is imported on first use only.
+        """
+        from aggregates import Aggregates
+
+        dataset, generation = self.__source.state()
+        aggregates, aggregates_generation = self.__aggregates
+        if aggregates is None or aggregates.dataset is not dataset or \
+                aggregates_generation != generation:
+            aggregates = Aggregates(dataset, self.COLUMNS)
+            self.__aggregates = (aggregates, generation)
+        return aggregates
+
+    def json_rows(self) -> EncodedRows:
+        """Cached JSON encoding of every row, built on first use."""
+        return self.__json_rows.covering(*self.__source.state())
+
+    def get_page(
+        self, page: int = 1, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> List[List]:
+        """Get a page of the dataset.
+
+        ``filters`` maps columns of ``FILTERABLE`` to the value rows
+        must have (e.g. ``{"year": 2016, "gender": "FEMALE"}``) and
+        ``sort`` names a column of ``SORTABLE``, prefixed with ``-``
+        for descending order (e.g. ``"-count"``).
+        """
+        _check_page(page, page_size)
 
         start_index, end_index = index_range(page, page_size)
+
+        if filters or sort:
+            index = self.secondary_index()
+            ids = index.query(filters, sort)
+            return take_rows(index.dataset, ids[start_index:end_index])
+
         dataset = self.dataset()
 
         if start_index >= len(dataset):
@@ -39,19 +169,200 @@ class Server:
 
         return dataset[start_index:end_index]
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        """Return a dictionary containing hypermedia pagination data."""
-        data = self.get_page(page, page_size)
-        total_items = len(self.dataset())
-        total_pages = math.ceil(total_items / page_size)
-
-        hypermedia_pagination = {
-            "page_size": len(data),
-            "page": page,
-            "data": data,
-            "next_page": page + 1 if page < total_pages else None,
-            "prev_page": page - 1 if page > 1 else None,
-            "total_pages": total_pages
+    def get_hyper(
+        self, page: int = 1, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Return a dictionary containing hypermedia pagination data.
+
+        With a page cache, a page is reused until the dataset changes.
+        """
+        _check_page(page, page_size)
+
+        cache = self.__page_cache
+        if cache is None:
+            return self._hyper(page, page_size, filters, sort)[0]
+        key = ("hyper", page, page_size, tuple(sorted(
+            (column, str(value)) for column, value in (filters or {}).items()
+        )), sort)
+        dataset = self.dataset()
+        hyper = cache.get(key, lambda token: token is dataset)
+        if hyper is None:
+            hyper, dataset = self._hyper(page, page_size, filters, sort)
+            cache.put(key, hyper, dataset)
+        # The cached page is shared: callers get their own rows
+        return dict(hyper, data=[list(row) for row in hyper["data"]])
+
+    def _hyper(
+        self, page: int, page_size: int,
+        filters: Optional[Dict[str, Any]], sort: Optional[str]
+    ) -> Tuple[Dict[str, Any], Sequence[List]]:
+        """Build a ``get_hyper`` page and return it with its dataset."""
+        dataset, _, positions, total_items = self._page_positions(
+            page, page_size, filters, sort
+        )
+        data = take_rows(dataset, positions)
+        return _envelope(page, page_size, data, total_items), dataset
+
+    def search_prefix(
+        self, prefix: str, page: int = 1, page_size: int = 10
+    ) -> Dict[str, Any]:
+        """Rows whose name starts with ``prefix`` (case-insensitive),
+        highest count first, in the envelope of ``get_hyper``.
+
+        A page costs O((page * page_size) log n), however many rows
+        match.
+        """
+        assert isinstance(prefix, str), "prefix must be a string"
+        _check_page(page, page_size)
+
+        index = self.prefix_index()
+        start_index, end_index = index_range(page, page_size)
+        ids = index.top(prefix, end_index)[start_index:]
+        data = take_rows(index.dataset, ids)
+        return _envelope(page, page_size, data, index.count(prefix))
+
+    def get_aggregate(
+        self, kind: str, page: int = 1, page_size: int = 10, **params: Any
+    ) -> Dict[str, Any]:
+        """Page through the rows of an aggregate, in the envelope of
+        ``get_hyper``.
+
+        ``kind`` is ``"group_sum"`` (``by``, ``value``), ``"top_k"``
+        (``k``, ``by``, ``value``) or ``"rank_histogram"`` (``by``);
+        see ``aggregates.Aggregates``. For example, the 5 most given
+        names per year and gender::
+
+            server.get_aggregate("top_k", 1, 20, k=5, by=["year", "gender"])
+
+        Each aggregate is computed once per version of the dataset.
+        """
+        _check_page(page, page_size)
+
+        rows = self.aggregates().query(kind, **params)
+        start_index, end_index = index_range(page, page_size)
+        data = rows[start_index:end_index]
+        return _envelope(page, page_size, data, len(rows))
+
+    def get_hyper_json(
+        self, page: int = 1, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> bytes:
+        """Return ``get_hyper`` serialized as JSON, without encoding rows.
+
+        The rows come pre-encoded from ``json_rows()``; the result is
+        byte-for-byte ``json.dumps(get_hyper(...)).encode()``.
+        """
+        _check_page(page, page_size)
+
+        dataset, generation, positions, total_items = self._page_positions(
+            page, page_size, filters, sort
+        )
+        encoded = self.__json_rows.covering(dataset, generation)
+        # dumps_page writes the encoded rows in place of "data"
+        return dumps_page(_envelope(page, page_size, positions, total_items),
+                          encoded.take(positions))
+
+    def _page_positions(
+        self, page: int, page_size: int,
+        filters: Optional[Dict[str, Any]], sort: Optional[str]
+    ) -> Tuple[Sequence[List], int, Sequence[int], int]:
+        """Locate a page: (dataset, generation, row positions, total).
+
+        Everything comes from one version of the dataset.
+        """
+        start_index, end_index = index_range(page, page_size)
+        if filters or sort:
+            # Served from the query cache: no rows are scanned
+            index, generation = self._secondary_index_state()
+            ids = index.query(filters, sort)
+            return (index.dataset, generation, ids[start_index:end_index],
+                    len(ids))
+        dataset, generation = self.__source.state()
+        positions = range(min(start_index, len(dataset)),
+                          min(end_index, len(dataset)))
+        return dataset, generation, positions, len(dataset)
+
+    def get_cursor_page(
+        self, cursor: Optional[str] = None, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Return the page after ``cursor`` using keyset pagination.
+
+        Start a listing with ``filters``/``sort`` and no cursor, then
+        pass back ``next_cursor``: it is signed and carries the query
+        and the last row seen, so each page costs one binary search
+        plus the rows returned, however deep the client is. A cursor
+        issued before the file was reloaded raises ValueError.
+        """
+        assert isinstance(page_size, int), "page_size must be an integer"
+        assert page_size > 0, "page_size must be a positive integer"
+
+        spec = sorted([column, str(value)]
+                      for column, value in (filters or {}).items())
+        last = None
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            assert (filters is None and sort is None) or \
+                (state["f"], state["s"]) == (spec, sort), \
+                "cursor does not match the query"
+            spec, sort, last = state["f"], state["s"], state["id"]
+
+        if spec or sort:
+            index, generation = self._secondary_index_state()
+            dataset = index.dataset
+            ids = index.query(dict(spec), sort)
+        else:
+            dataset, generation = self.__source.state()
+            ids = range(len(dataset))
+
+        start = 0
+        if last is not None:
+            # Ids of another generation may point at other rows, or none
+            if state.get("g") != generation or \
+                    not 0 <= last < len(dataset):
+                raise ValueError("invalid cursor")
+            if sort is None:
+                start = seek_after(ids, int, last)
+            else:
+                position = index.positions[sort.lstrip("-")]
+                start = seek_after(ids, position.__getitem__,
+                                   position[last], sort.startswith("-"))
+        page_ids = ids[start:start + page_size]
+
+        next_cursor = None
+        if start + page_size < len(ids):
+            next_cursor = encode_cursor(
+                {"f": spec, "s": sort, "id": page_ids[-1], "g": generation}
+            )
+
+        return {
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "page_size": len(page_ids),
+            "data": take_rows(dataset, page_ids),
         }
 
-        return hypermedia_pagination
+    def iter_pages(
+        self, page_size: int = 10, start: int = 1, prefetch: int = 2,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> Iterator[List[List]]:
+        """Lazily yield pages from ``start`` until the results end.
+
+        The next ``prefetch`` pages are fetched on a background thread
+        while the current one is processed; prefetching stops as soon
+        as the caller stops iterating.
+        """
+        assert isinstance(start, int), "start must be an integer"
+        assert start > 0, "start must be a positive integer"
+
+        def pages() -> Iterator[List[List]]:
+            page = start
+            while True:
+                data = self.get_page(page, page_size, filters, sort)
+                if not data:
+                    return
+                yield data
+                page += 1
+
+        return prefetched(pages(), prefetch)
@@ -3,64 +3,189 @@
 Deletion-resilient hypermedia pagination
 """
 
-import csv
 import math
-from typing import List, Dict, Any, Optional
+import threading
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple, Union)
+
+from cursor import decode_cursor, encode_cursor
+from dataset_source import DatasetSource
+from deletion_index import DeletableRows
+from json_rows import EncodedRows, EncodedRowsCache, dumps_page
+from page_cache import PageCache
+from prefetch import prefetched
 
 
 class Server:
     """Server class to paginate a database of popular baby names.
+
+    Safe to share between threads. Readers work on an immutable
+    snapshot of the deletion index and take no lock; ``delete`` builds
+    the next snapshot under a writer lock and publishes it with one
+    reference swap, so a page never sees half of a batch.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
-        self.__dataset = None
-        self.__indexed_dataset = None
+    def __init__(self, mode: str = "eager", workers: Optional[int] = 1,
+                 watch: Optional[float] = None,
+                 data_file: Union[str, Sequence[str], None] = None,
+                 page_cache: Optional[PageCache] = None,
+                 source: Optional[DatasetSource] = None):
+        """Create a server; ``mode`` and ``workers`` select how the CSV
+        is loaded (see ``dataset_loader.load_dataset``). With ``watch``
+        set, the file is checked for changes at most every ``watch``
+        seconds and followed (see ``dataset_source.DatasetSource``).
+
+        ``data_file`` replaces ``DATA_FILE``; a list of files is served
+        as one dataset, each file parsed only once a page reaches it
+        (see ``sharded_dataset.ShardedDataset``).
 
-    def dataset(self) -> List[List]:
+        ``page_cache`` (e.g. ``PageCache("LFU", 256)``) caches page
+        results; see ``page_cache()``.
+
+        ``source`` shares the dataset of another server (see
+        ``source()``) instead of loading the file again; the loading
+        arguments are then ignored."""
+        self.__source = source or DatasetSource(
+            data_file or self.DATA_FILE, mode, workers, watch)
+        self.__page_cache = page_cache
+        self.__indexed = (None, None)  # (snapshot, dataset generation)
+        self.__write_lock = threading.RLock()
+        self.__json_rows = EncodedRowsCache()
+
+    def dataset(self) -> Sequence[List]:
         """Cached dataset"""
-        if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]  # Skip the header row
-        return self.__dataset
-
-    def indexed_dataset(self) -> Dict[int, List]:
-        """Dataset indexed by sorting position, starting at 0"""
-        if self.__indexed_dataset is None:
-            dataset = self.dataset()
-            self.__indexed_dataset = {
-                i: dataset[i] for i in range(len(dataset))
-            }
-        return self.__indexed_dataset
+        return self.__source.current()
+
+    def page_cache(self) -> Optional[PageCache]:
+        """The page result cache, if enabled; ``stats()`` gives its hit
+        ratio."""
+        return self.__page_cache
+
+    def source(self) -> DatasetSource:
+        """The source following the data file(s)."""
+        return self.__source
+
+    def indexed_dataset(self) -> DeletableRows:
+        """Dataset indexed by sorting position, starting at 0.
+
+        Deleting an index (``del``, or ``delete`` in bulk) keeps the
+        numbering of every other row. Rows appended to the file get
+        the next indices and deletions are kept; a reloaded file starts
+        over with every row live.
+
+        The object returned is the current snapshot. Deleting from it
+        directly is only safe without concurrent readers; use
+        ``delete`` otherwise.
+        """
+        return self._indexed_state()[0]
+
+    def _indexed_state(self) -> Tuple[DeletableRows, int]:
+        """The current snapshot and the dataset generation it covers."""
+        dataset, generation = self.__source.state()
+        state = self.__indexed
+        indexed, indexed_generation = state
+        if indexed is not None and indexed.rows is dataset and \
+                indexed_generation == generation:
+            return state
+        with self.__write_lock:
+            indexed, indexed_generation = self.__indexed
+            if indexed is None or indexed_generation != generation:
+                indexed = DeletableRows(dataset)
+            elif indexed.rows is not dataset:
+                indexed = indexed.extended(dataset)
+            self.__indexed = (indexed, generation)
+        return indexed, generation
+
+    def json_rows(self) -> EncodedRows:
+        """Cached JSON encoding of every row, built on first use."""
+        return self.__json_rows.covering(*self.__source.state())
+
+    def delete(self, indices: Iterable[int]) -> int:
+        """Delete a batch of indices and publish it atomically.
+
+        Readers see either none or all of the batch; batching many
+        indices per call amortizes the copy of the deletion bitmap.
+
+        Returns:
+            int: How many rows were actually deleted.
+        """
+        with self.__write_lock:
+            indexed = self.indexed_dataset()
+            updated = indexed.deleted(indices)
+            deleted = len(indexed) - len(updated)
+            if deleted:
+                self.__indexed = (updated, self.__indexed[1])
+        return deleted
+
+    def compact(self) -> int:
+        """Drop deleted slots and renumber the live rows from 0, then
+        publish the result atomically.
+
+        Indices and cursors handed out before no longer refer to the
+        same rows.
+
+        Returns:
+            int: How many slots were dropped.
+        """
+        with self.__write_lock:
+            indexed = self.indexed_dataset()
+            dropped = indexed.size - len(indexed)
+            if dropped:
+                self.__indexed = (indexed.compacted(), self.__indexed[1])
+        return dropped
 
     def get_hyper_index(
         self, index: int = None, page_size: int = 10
     ) -> Dict[str, Any]:
         """Return a dictionary containing hypermedia pagination
-        data, resilient to deletions."""
+        data, resilient to deletions.
+
+        With a page cache, a page is reused until a row in its range is
+        deleted, the rows are reloaded or compacted, or (for the last
+        page) rows are appended.
+        """
         indexed_data = self.indexed_dataset()
 
         # Assert that the index is within the valid range
         assert isinstance(index, int), "index must be an integer"
         assert index >= 0, "index must be non-negative"
-        assert index < len(indexed_data), "index out of range"
+        assert index < indexed_data.size, "index out of range"
+
+        cache = self.__page_cache
+        if cache is None:
+            return self._hyper_index(indexed_data, index, page_size)
 
-        data = []
-        next_index = index
-        current_count = 0
+        def valid(token: Tuple) -> bool:
+            layout, rows, end, live, last = token
+            # Deletions only remove rows: an unchanged live count means
+            # an unchanged range
+            return layout is indexed_data.layout and \
+                indexed_data.rank(end) - indexed_data.rank(index) == live \
+                and not (last and rows is not indexed_data.rows)
 
-        # Collect the correct page of data, skipping missing indices
-        while current_count < page_size and next_index < len(indexed_data):
-            item = indexed_data.get(next_index)
-            if item:
-                data.append(item)
-                current_count += 1
-            next_index += 1
+        key = ("index", index, page_size)
+        hyper = cache.get(key, valid)
+        if hyper is None:
+            hyper = self._hyper_index(indexed_data, index, page_size)
+            last = hyper["next_index"] is None
+            end = indexed_data.size if last else hyper["next_index"]
+            cache.put(key, hyper, (indexed_data.layout, indexed_data.rows,
+                                   end, hyper["page_size"], last))
+        # The cached page is shared: callers get their own rows
+        return dict(hyper, data=[list(row) for row in hyper["data"]])
+
+    def _hyper_index(self, indexed_data: DeletableRows, index: int,
+                     page_size: int) -> Dict[str, Any]:
+        """Build a ``get_hyper_index`` page from ``indexed_data``."""
+        # Seek the next live rows, skipping deleted indices
+        slots = indexed_data.next_live(index, page_size)
+        data = indexed_data.rows_at(slots)
 
         # Return the next index to query, or None if we've reached the end
-        next_index = next_index if next_index < len(indexed_data) else None
+        next_index = None
+        if len(slots) == page_size and slots[-1] + 1 < indexed_data.size:
+            next_index = slots[-1] + 1
 
         return {
             "index": index,
@@ -68,3 +193,92 @@ class Server:
             "page_size": len(data),
             "data": data,
         }
+
+    def get_hyper_index_json(
+        self, index: int = None, page_size: int = 10
+    ) -> bytes:
+        """Return ``get_hyper_index`` serialized as JSON, without
+        encoding rows.
+
+        The rows come pre-encoded from ``json_rows()``; the result is
+        byte-for-byte ``json.dumps(get_hyper_index(...)).encode()``.
+        """
+        indexed_data, generation = self._indexed_state()
+
+        assert isinstance(index, int), "index must be an integer"
+        assert index >= 0, "index must be non-negative"
+        assert index < indexed_data.size, "index out of range"
+
+        slots = indexed_data.next_live(index, page_size)
+        encoded = self.__json_rows.covering(indexed_data.rows, generation)
+
+        next_index = None
+        if len(slots) == page_size and slots[-1] + 1 < indexed_data.size:
+            next_index = slots[-1] + 1
+
+        return dumps_page({
+            "index": index,
+            "next_index": next_index,
+            "page_size": len(slots),
+            "data": None,
+        }, encoded.take(indexed_data.positions(slots)))
+
+    def get_cursor_page(
+        self, cursor: Optional[str] = None, page_size: int = 10
+    ) -> Dict[str, Any]:
+        """Return the live rows after ``cursor`` using keyset pagination.
+
+        The signed cursor carries the index of the last row returned,
+        so deletions between requests never make a client skip or
+        repeat rows, and each page is one seek in the deletion index.
+        Cursors do not survive ``compact()``, which renumbers rows, nor
+        a reload of the file: they raise ValueError.
+        """
+        assert isinstance(page_size, int), "page_size must be an integer"
+        assert page_size > 0, "page_size must be a positive integer"
+
+        indexed_data, generation = self._indexed_state()
+        start = 0
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            if [state.get("g"), state.get("c")] != \
+                    [generation, indexed_data.compactions] or \
+                    not 0 <= state["id"] < indexed_data.size:
+                raise ValueError("invalid cursor")
+            start = state["id"] + 1
+
+        slots = indexed_data.next_live(start, page_size)
+        next_cursor = None
+        if slots and indexed_data.next_live(slots[-1] + 1, 1):
+            next_cursor = encode_cursor({"id": slots[-1], "g": generation,
+                                         "c": indexed_data.compactions})
+
+        return {
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "page_size": len(slots),
+            "data": indexed_data.rows_at(slots),
+        }
+
+    def iter_pages(
+        self, page_size: int = 10, start: int = 0, prefetch: int = 2
+    ) -> Iterator[List[List]]:
+        """Lazily yield pages of live rows from index ``start``.
+
+        Pages follow ``next_index`` exactly like ``get_hyper_index``.
+        The next ``prefetch`` pages are fetched on a background thread
+        while the current one is processed; prefetching stops as soon
+        as the caller stops iterating.
+        """
+        assert isinstance(start, int), "start must be an integer"
+        assert start >= 0, "start must be non-negative"
+
+        def pages() -> Iterator[List[List]]:
+            index = start
+            while index is not None and index < self.indexed_dataset().size:
+                hyper = self.get_hyper_index(index, page_size)
+                if hyper["data"]:
+                    yield hyper["data"]
+                index = hyper["next_index"]
+
+        return prefetched(pages(), prefetch)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Vectorized aggregate queries over the baby-names dataset.
+
+The dataset is converted once into NumPy arrays: every column as
+dense integer codes into its sorted distinct values, and the integer
+columns also as ``int64`` values. Every
+query is then a handful of array operations (``bincount``, ``unique``,
+``argpartition``) instead of a Python loop over rows. Results are plain
+lists of rows, kept once computed, so they page like the dataset.
+"""
+from typing import Any, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from columnar import Buffer, CategoricalColumn, StringColumn
+
+INT_COLUMNS = ("year", "count", "rank")
+CONVERT_CHUNK = 1 << 16
+
+
+class Aggregates:
+    """Group-by, top-k and distribution queries over one dataset.
+
+    ``columns`` names the fields of each row. Results are materialized
+    on first request and reused for the life of the object, which
+    belongs to one version of the dataset.
+    """
+
+    def __init__(self, dataset: Sequence[List[str]], columns: Sequence[str]):
+        """Convert ``dataset`` to arrays, one column at a time."""
+        self.dataset = dataset
+        self.columns = tuple(columns)
+        self.size = len(dataset)
+        self.codes = {}
+        self.labels = {}
+        self.ints = {}
+        self._results = {}
+        stored = getattr(dataset, "columns", None)
+        if stored is None:
+            encoded = self._encode_rows()
+        for j, name in enumerate(self.columns):
+            if stored is not None and stored[j].kind == "int":
+                values = self._buffer(stored[j].values)
+                labels, codes = np.unique(values, return_inverse=True)
+                self.ints[name] = values
+                self.codes[name] = codes.reshape(-1)
+                self.labels[name] = labels.tolist()
+                continue
+            if stored is not None:
+                codes, labels = self._from_column(stored[j])
+            else:
+                codes, labels = encoded[j]
+            if name in INT_COLUMNS:
+                labels = np.array(labels, dtype=np.int64)
+                self.ints[name] = labels[codes]
+                # Text order is not numeric order: sort the labels again
+                order = np.argsort(labels, kind="stable")
+                remap = np.empty(len(order), dtype=np.int64)
+                remap[order] = np.arange(len(order))
+                codes, labels = remap[codes], labels[order].tolist()
+            self.codes[name] = codes
+            self.labels[name] = labels
+
+    def query(self, kind: str, **params: Any) -> List[List]:
+        """Rows of aggregate ``kind`` (``group_sum``, ``top_k`` or
+        ``rank_histogram``) with ``params``, computed once."""
+        key = (kind, tuple(sorted((name, tuple(value) if isinstance(
+            value, (list, tuple)) else value)
+            for name, value in params.items())))
+        result = self._results.get(key)
+        if result is None:
+            assert kind in ("group_sum", "top_k", "rank_histogram"), \
+                "unknown aggregate {!r}".format(kind)
+            result = getattr(self, kind)(**params)
+            self._results[key] = result
+        return result
+
+    def group_sum(self, by: Sequence[str] = ("year",),
+                  value: str = "count") -> List[List]:
+        """Total of ``value`` per distinct combination of ``by``.
+
+        Rows are ``[*group, total]``, ordered by group.
+        """
+        groups, keys = self._groups(by)
+        totals = np.bincount(groups, weights=self.ints[value],
+                             minlength=len(keys))
+        return [key + [int(total)] for key, total in zip(
+            self._decode(by, keys), totals)]
+
+    def top_k(self, k: int = 10, by: Sequence[str] = (),
+              value: str = "count") -> List[List]:
+        """The ``k`` names with the highest total ``value`` per group.
+
+        Rows are ``[*group, name, total]``, ordered by group, then by
+        total (highest first) and name.
+        """
+        assert isinstance(k, int) and k > 0, "k must be a positive integer"
+        by = tuple(by)
+        # Total per (group, name), then the best k of each group
+        pairs, keys = self._groups(by + ("name",))
+        totals = np.bincount(pairs, weights=self.ints[value],
+                             minlength=len(keys)).astype(np.int64)
+        group_of = self._combine(keys[:, :-1])
+        order = np.argsort(group_of, kind="stable")
+        bounds = np.flatnonzero(np.diff(group_of[order])) + 1
+        selected = []
+        for members in np.split(order, bounds):
+            if len(members) > k:
+                # Only the k best need ordering
+                best = np.argpartition(-totals[members], k - 1)[:k]
+                members = members[best]
+            # Keys are sorted, so ties on total fall back to the name
+            selected.append(members[np.lexsort((members, -totals[members]))])
+        selected = np.concatenate(selected) if selected else \
+            np.zeros(0, dtype=np.int64)
+        return [key + [total] for key, total in zip(
+            self._decode(by + ("name",), keys[selected]),
+            totals[selected].tolist())]
+
+    def rank_histogram(self, by: Sequence[str] = ()) -> List[List]:
+        """Number of rows per rank, per distinct combination of ``by``.
+
+        Rows are ``[*group, rank, rows]``, ordered by group and rank.
+        """
+        groups, keys = self._groups(tuple(by) + ("rank",))
+        counts = np.bincount(groups, minlength=len(keys))
+        return [key + [int(count)] for key, count in zip(
+            self._decode(tuple(by) + ("rank",), keys), counts)]
+
+    def _groups(self, by: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Group id of every row, and the distinct keys: one row of
+        column codes per group, in sorted order."""
+        for name in by:
+            assert name in self.columns, "unknown column {!r}".format(name)
+        if not by:
+            return (np.zeros(self.size, dtype=np.int64),
+                    np.zeros((1, 0), dtype=np.int64))
+        dims = [len(self.labels[name]) for name in by]
+        combined = np.ravel_multi_index([self.codes[name] for name in by],
+                                        dims)
+        distinct, groups = np.unique(combined, return_inverse=True)
+        keys = np.stack(np.unravel_index(distinct, dims), axis=1)
+        return groups.reshape(-1), keys
+
+    def _combine(self, keys: np.ndarray) -> np.ndarray:
+        """One integer per distinct row of ``keys``."""
+        if not keys.shape[1]:
+            return np.zeros(len(keys), dtype=np.int64)
+        dims = keys.max(axis=0) + 1
+        return np.ravel_multi_index(keys.T, dims)
+
+    def _decode(self, by: Sequence[str], keys: np.ndarray) -> List[List]:
+        """Turn rows of codes back into rows of values."""
+        decoded = [[] for _ in range(len(keys))]
+        for j, name in enumerate(by):
+            labels = self.labels[name]
+            for row, code in zip(decoded, keys[:, j].tolist()):
+                row.append(labels[code])
+        return decoded
+
+    def _encode_rows(self) -> List[Tuple[np.ndarray, List[str]]]:
+        """Codes and sorted labels of every column, reading the rows
+        once.
+
+        Dicts assign codes as rows are read, which is faster than
+        sorting every value; only the distinct values are sorted.
+        """
+        tables = [{} for _ in self.columns]
+        codes = [[] for _ in self.columns]
+        for start in range(0, self.size, CONVERT_CHUNK):
+            chunk = self.dataset[start:start + CONVERT_CHUNK]
+            for j, (table, column) in enumerate(zip(tables, codes)):
+                code = table.setdefault
+                column.extend([code(row[j], len(table)) for row in chunk])
+        return [self._sorted_codes(np.array(column, dtype=np.int64),
+                                   list(table))
+                for table, column in zip(tables, codes)]
+
+    def _buffer(self, values: Buffer) -> np.ndarray:
+        """An ``array`` or ``memoryview`` of integers as ``int64``."""
+        dtype = getattr(values, "typecode", None) or values.format
+        return np.frombuffer(values, dtype=dtype)[:self.size].astype(
+            np.int64)
+
+    def _sorted_codes(self, codes: np.ndarray, strings: List[str]
+                      ) -> Tuple[np.ndarray, List[str]]:
+        """Renumber ``codes`` into ``strings`` so labels are sorted."""
+        order = np.argsort(np.array(strings), kind="stable")
+        remap = np.empty(len(order), dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        return remap[codes], [strings[i] for i in order]
+
+    def _from_column(self, column: Union[CategoricalColumn, StringColumn]
+                     ) -> Tuple[np.ndarray, List[str]]:
+        """Codes and sorted labels of a text column of a
+        ``ColumnarDataset``, without building rows."""
+        strings = [column.string(code) for code in range(column.cardinality)]
+        codes = np.frombuffer(column.codes, dtype=getattr(
+            column.codes, "typecode", None) or column.codes.format)
+        return self._sorted_codes(codes[:self.size], strings)
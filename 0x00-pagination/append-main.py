@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+""" append-main: a DatasetSource follows rows appended to its file """
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "benchmarks"))
+
+from dataset_source import DatasetSource  # noqa: E402
+from synth import write_csv  # noqa: E402
+
+for mode in ("eager", "columnar", "mmap"):
+    path = os.path.join(tempfile.mkdtemp(), "Popular_Baby_Names.csv")
+    write_csv(path, 40)
+    source = DatasetSource(path, mode, watch=0)
+    dataset, generation = source.state()
+    print(mode, len(dataset), generation)
+
+    # The writer is mid-row: nothing changes until the row is complete
+    with open(path, "a") as f:
+        f.write("2016,FEMALE,HISP")
+    source.refresh(wait=True)
+    dataset, generation = source.state()
+    print(mode, len(dataset), generation)
+
+    with open(path, "a") as f:
+        f.write("ANIC,Zoe,12,3\n")
+    source.refresh(wait=True)
+    dataset, generation = source.state()
+    print(mode, len(dataset), generation, list(dataset[-1]))
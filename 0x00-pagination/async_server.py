@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Asyncio front end for the pagination servers.
+"""
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import Executor
+from typing import (Any, AsyncIterator, Callable, Dict, Iterable, List,
+                    Optional, Sequence, Union)
+
+from dataset_source import DatasetSource
+from page_cache import PageCache
+
+HyperServer = __import__("2-hypermedia_pagination").Server
+IndexServer = __import__("3-hypermedia_del_pagination").Server
+
+
+class AsyncServer:
+    """Awaitable ``get_page``, ``get_hyper`` and ``get_hyper_index``.
+
+    Requests run on ``executor`` (the loop's default executor if None)
+    against a hypermedia server and a deletion-resilient server that
+    share one dataset, so parsing the CSV or building an index never
+    blocks the event loop. The first load of the dataset, and the
+    first build of each index, is single-flight: concurrent callers
+    await the same load instead of each starting one, and a caller
+    that is cancelled does not cancel it for the others.
+    """
+
+    def __init__(self, mode: str = "eager", workers: Optional[int] = 1,
+                 watch: Optional[float] = None,
+                 data_file: Union[str, Sequence[str], None] = None,
+                 page_cache: Optional[PageCache] = None,
+                 executor: Optional[Executor] = None):
+        """Create the servers; the arguments are those of ``Server``
+        (see ``2-hypermedia_pagination``). Nothing is loaded yet."""
+        self.__hyper = HyperServer(mode, workers, watch, data_file,
+                                   page_cache)
+        self.__index = IndexServer(page_cache=page_cache,
+                                   source=self.__hyper.source())
+        self.__executor = executor
+        self.__flights = {}  # name -> future of its first build
+
+    def hyper_server(self) -> HyperServer:
+        """The ``2-hypermedia_pagination`` server answering requests."""
+        return self.__hyper
+
+    def index_server(self) -> IndexServer:
+        """The ``3-hypermedia_del_pagination`` server answering
+        requests."""
+        return self.__index
+
+    def source(self) -> DatasetSource:
+        """The source following the data file(s)."""
+        return self.__hyper.source()
+
+    async def load(self) -> None:
+        """Load the dataset off the event loop, once."""
+        await self._once("dataset", self.__hyper.dataset)
+
+    async def get_page(
+        self, page: int = 1, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> List[List]:
+        """Await ``Server.get_page`` (see ``2-hypermedia_pagination``)."""
+        await self._prepare(filters, sort)
+        return await self._run(self.__hyper.get_page, page, page_size,
+                               filters, sort)
+
+    async def get_hyper(
+        self, page: int = 1, page_size: int = 10,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Await ``Server.get_hyper`` (see ``2-hypermedia_pagination``)."""
+        await self._prepare(filters, sort)
+        return await self._run(self.__hyper.get_hyper, page, page_size,
+                               filters, sort)
+
+    async def get_hyper_index(
+        self, index: int = None, page_size: int = 10
+    ) -> Dict[str, Any]:
+        """Await ``Server.get_hyper_index`` (see
+        ``3-hypermedia_del_pagination``)."""
+        await self.load()
+        await self._once("indexed_dataset", self.__index.indexed_dataset)
+        return await self._run(self.__index.get_hyper_index, index,
+                               page_size)
+
+    async def delete(self, indices: Iterable[int]) -> int:
+        """Await ``Server.delete`` (see ``3-hypermedia_del_pagination``)."""
+        await self.load()
+        return await self._run(self.__index.delete, indices)
+
+    async def iter_pages(
+        self, page_size: int = 10, start: int = 1, prefetch: int = 2,
+        filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None
+    ) -> AsyncIterator[List[List]]:
+        """Yield pages from ``start`` until the results end.
+
+        The next ``prefetch`` pages are requested while the current
+        one is processed; they are cancelled if the caller stops.
+        """
+        assert isinstance(start, int), "start must be an integer"
+        assert start > 0, "start must be a positive integer"
+        pending = deque()
+        page = start
+        try:
+            while True:
+                while len(pending) <= max(prefetch, 0):
+                    pending.append(asyncio.ensure_future(self.get_page(
+                        page, page_size, filters, sort)))
+                    page += 1
+                data = await pending.popleft()
+                if not data:
+                    return
+                yield data
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_index_pages(
+        self, page_size: int = 10, start: int = 0
+    ) -> AsyncIterator[List[List]]:
+        """Yield pages of live rows from index ``start``, following
+        ``next_index`` like ``get_hyper_index``.
+
+        Each page is requested as soon as the previous one is known,
+        while the caller processes that one.
+        """
+        assert isinstance(start, int), "start must be an integer"
+        assert start >= 0, "start must be non-negative"
+        await self.load()
+        await self._once("indexed_dataset", self.__index.indexed_dataset)
+        indexed = await self._run(self.__index.indexed_dataset)
+        if start >= indexed.size:
+            return
+        following = asyncio.ensure_future(
+            self.get_hyper_index(start, page_size))
+        try:
+            while following is not None:
+                hyper = await following
+                following = None
+                if hyper["next_index"] is not None:
+                    following = asyncio.ensure_future(self.get_hyper_index(
+                        hyper["next_index"], page_size))
+                if hyper["data"]:
+                    yield hyper["data"]
+        finally:
+            if following is not None:
+                following.cancel()
+
+    async def _prepare(self, filters: Optional[Dict[str, Any]],
+                       sort: Optional[str]) -> None:
+        """Load what a ``get_page`` or ``get_hyper`` request needs."""
+        await self.load()
+        if filters or sort:
+            await self._once("secondary_index", self.__hyper.secondary_index)
+
+    async def _once(self, name: str, build: Callable[[], Any]) -> Any:
+        """Result of ``build()``, run once in the executor and shared
+        by every caller; a failed build is retried by the next one."""
+        flight = self.__flights.get(name)
+        if flight is None:
+            flight = asyncio.ensure_future(self._run(build))
+            self.__flights[name] = flight
+
+            def landed(done: asyncio.Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    self.__flights.pop(name, None)
+
+            flight.add_done_callback(landed)
+        return await asyncio.shield(flight)
+
+    async def _run(self, call: Callable, *args: Any) -> Any:
+        """Await ``call(*args)`` on the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, functools.partial(call, *args))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Read throughput of the deletion-resilient server under concurrent deletes.
+
+Reader threads page through ``get_hyper_index`` from random indices
+while a writer thread deletes random batches with ``Server.delete``.
+Every page must be full unless it reaches the end of the rows.
+Throughput is reported for the readers alone, then with the writer
+running.
+
+Usage: concurrency_bench.py [CSV | --rows N] [--readers N] [--seconds S]
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from synth import write_csv  # noqa: E402
+
+Server = importlib.import_module("3-hypermedia_del_pagination").Server
+
+
+def read_pages(server, stop: threading.Event, counts: list, slot: int,
+               page_size: int, seed: int) -> None:
+    """Fetch random pages until ``stop`` is set, counting them."""
+    rng = random.Random(seed)
+    size = server.indexed_dataset().size
+    pages = 0
+    while not stop.is_set():
+        index = rng.randrange(size)
+        hyper = server.get_hyper_index(index, page_size)
+        data, next_index = hyper["data"], hyper["next_index"]
+        assert len(data) == page_size or next_index is None, \
+            "short page before the end"
+        pages += 1
+    counts[slot] = pages
+
+
+def delete_batches(server, stop: threading.Event, totals: list,
+                   batch: int, seed: int) -> None:
+    """Delete random batches of indices until ``stop`` is set."""
+    rng = random.Random(seed)
+    size = server.indexed_dataset().size
+    batches = deleted = 0
+    while not stop.is_set():
+        deleted += server.delete(rng.randrange(size) for _ in range(batch))
+        batches += 1
+    totals[:] = [batches, deleted]
+
+
+def run(server, readers: int, seconds: float, page_size: int,
+        batch: int, with_writer: bool):
+    """Return (pages read per second, batches, rows deleted)."""
+    stop = threading.Event()
+    counts = [0] * readers
+    totals = [0, 0]
+    threads = [threading.Thread(target=read_pages, args=(
+        server, stop, counts, i, page_size, i)) for i in range(readers)]
+    if with_writer:
+        threads.append(threading.Thread(target=delete_batches, args=(
+            server, stop, totals, batch, readers)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds, totals[0], totals[1]
+
+
+def main() -> None:
+    """Run the benchmark on a given or generated CSV."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--mode", default="columnar")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    path = args.csv
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "Popular_Baby_Names.csv")
+        write_csv(path, args.rows)
+    Server.DATA_FILE = path
+    server = Server(args.mode)
+    print("file: {}, rows: {}, readers: {}, batch: {}".format(
+        path, server.indexed_dataset().size, args.readers, args.batch))
+    print("{:<12} {:>12} {:>9} {:>12}".format(
+        "writer", "pages_per_s", "batches", "rows_deleted"))
+    for with_writer in (False, True):
+        rate, batches, deleted = run(server, args.readers, args.seconds,
+                                     args.page_size, args.batch, with_writer)
+        print("{:<12} {:>12.0f} {:>9} {:>12}".format(
+            "on" if with_writer else "off", rate, batches, deleted))
+
+
+if __name__ == "__main__":
+    main()
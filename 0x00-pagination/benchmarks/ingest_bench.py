@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Scaling of parallel CSV ingestion with the number of worker processes.
+
+Times ``load_dataset`` in the "eager" and "columnar" modes with 1, 2,
+4, ... up to ``os.cpu_count()`` workers and reports the speedup over
+the single-process path.
+
+Usage: ingest_bench.py [CSV | --rows N] [--max-workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from dataset_loader import load_dataset  # noqa: E402
+from synth import write_csv  # noqa: E402
+
+
+def worker_counts(limit: int):
+    """1, 2, 4, ... up to and including ``limit``."""
+    count = 1
+    while count < limit:
+        yield count
+        count *= 2
+    yield limit
+
+
+def best_of(repeat: int, path: str, mode: str, workers: int) -> float:
+    """Fastest of ``repeat`` loads, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_dataset(path, mode, workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Run the benchmark on a given or generated CSV."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--max-workers", type=int,
+                        default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    path = args.csv
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "Popular_Baby_Names.csv")
+        write_csv(path, args.rows)
+    print("file: {} ({:.1f} MB), cpus: {}".format(
+        path, os.path.getsize(path) / 2 ** 20, os.cpu_count()))
+    print("{:<10} {:>8} {:>9} {:>8}".format(
+        "mode", "workers", "load_s", "speedup"))
+    for mode in ("eager", "columnar"):
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            elapsed = best_of(args.repeat, path, mode, workers)
+            baseline = baseline or elapsed
+            print("{:<10} {:>8} {:>9.2f} {:>7.2f}x".format(
+                mode, workers, elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
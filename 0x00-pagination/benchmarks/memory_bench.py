@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of the dataset representations.
+
+Loads the same CSV as a list of lists ("eager"), as array-backed
+columns ("columnar") and as a memory-mapped row index ("mmap"), and
+reports the Python heap each one retains, measured with tracemalloc.
+
+Usage: memory_bench.py [CSV | --rows N]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from dataset_loader import load_dataset  # noqa: E402
+from synth import write_csv  # noqa: E402
+
+MODES = ("eager", "columnar", "mmap")
+
+
+def measure(path: str, mode: str) -> dict:
+    """Load ``path`` with ``mode`` and return its memory statistics."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    dataset = load_dataset(path, mode)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"mode": mode, "rows": len(dataset), "load_s": elapsed,
+              "retained_bytes": retained, "peak_bytes": peak}
+    del dataset
+    return result
+
+
+def main(argv) -> None:
+    """Run the benchmark on a given or generated CSV."""
+    if len(argv) == 2 and not argv[1].startswith("--"):
+        path = argv[1]
+    else:
+        rows = int(argv[2]) if len(argv) == 3 else 1000000
+        path = os.path.join(tempfile.mkdtemp(), "Popular_Baby_Names.csv")
+        write_csv(path, rows)
+    print("{:<10} {:>10} {:>9} {:>14} {:>14} {:>10}".format(
+        "mode", "rows", "load_s", "retained_MB", "peak_MB", "bytes/row"))
+    for mode in MODES:
+        r = measure(path, mode)
+        print("{:<10} {:>10} {:>9.2f} {:>14.1f} {:>14.1f} {:>10.1f}".format(
+            r["mode"], r["rows"], r["load_s"], r["retained_bytes"] / 2 ** 20,
+            r["peak_bytes"] / 2 ** 20,
+            r["retained_bytes"] / max(r["rows"], 1)))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
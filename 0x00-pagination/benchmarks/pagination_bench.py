@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Pagination benchmark suite with JSON output.
+
+For every dataset size, loading mode and deleted fraction, a fresh
+process loads a synthetic CSV and measures:
+
+- cold load: time of the first ``dataset()`` call, with the ``.idx``
+  and ``.snap`` side files removed first, and of the deletion index;
+- peak RSS of the process;
+- p50/p99 latency of ``get_page``, ``get_hyper`` and
+  ``get_hyper_index`` at shallow (first 1%) and deep (last 1%)
+  offsets, after deleting the given fraction of rows at random;
+- ``get_hyper`` throughput from 1, 2, ... threads.
+
+Generated CSVs are kept in ``--workdir`` and reused. Results are
+printed (or written to ``--output``) as JSON. With ``--baseline``,
+they are compared with an earlier run and the exit status is 1 if
+any time got slower, or any throughput lower, by more than
+``--tolerance``.
+
+Usage: pagination_bench.py [--rows N,...] [--modes M,...]
+                           [--deleted F,...] [--output FILE]
+                           [--baseline FILE [--tolerance F]]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from synth import write_csv  # noqa: E402
+
+OFFSETS = {"shallow": (0.0, 0.01), "deep": (0.99, 1.0)}
+DELETE_BATCH = 1 << 16
+# Metrics where a higher value is a regression; throughputs are the
+# other way round, and the rest are not compared
+LOWER_IS_BETTER = ("_s", "_ms", "_bytes")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Value below which ``fraction`` of the sorted ``samples`` fall."""
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def dataset_file(workdir: str, rows: int) -> str:
+    """Path of a synthetic CSV of ``rows`` rows, generated once."""
+    path = os.path.join(workdir, "names_{}.csv".format(rows))
+    if not os.path.exists(path):
+        partial = path + ".part"
+        write_csv(partial, rows)
+        os.replace(partial, path)
+    return path
+
+
+def latencies(call: Callable[[int], object], lo: int, hi: int,
+              queries: int, rng: random.Random) -> Dict[str, float]:
+    """p50 and p99 of ``call`` on random arguments in ``[lo, hi)``, in
+    milliseconds."""
+    samples = []
+    for _ in range(queries):
+        argument = rng.randrange(lo, max(hi, lo + 1))
+        start = time.perf_counter()
+        call(argument)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {"p50_ms": percentile(samples, 0.5) * 1e3,
+            "p99_ms": percentile(samples, 0.99) * 1e3}
+
+
+def throughput(call: Callable[[int], object], pages: int, threads: int,
+               seconds: float) -> float:
+    """Calls of ``call`` per second from ``threads`` threads."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def worker(slot: int) -> None:
+        rng = random.Random(slot)
+        calls = 0
+        while not stop.is_set():
+            call(rng.randrange(pages) + 1)
+            calls += 1
+        counts[slot] = calls
+
+    workers = [threading.Thread(target=worker, args=(slot,))
+               for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(case: dict) -> dict:
+    """Run one case in this process and return its metrics."""
+    hyper_server = __import__("2-hypermedia_pagination").Server
+    index_server = __import__("3-hypermedia_del_pagination").Server
+    path, page_size = case["path"], case["page_size"]
+    for suffix in (".idx", ".snap"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(0)
+    result = dict(case)
+
+    server = hyper_server(case["mode"], data_file=path)
+    start = time.perf_counter()
+    size = len(server.dataset())
+    result["load_s"] = time.perf_counter() - start
+    deletions = index_server(source=server.source())
+    start = time.perf_counter()
+    indexed = deletions.indexed_dataset()
+    result["index_build_s"] = time.perf_counter() - start
+
+    # Deleted before any reader exists, so in place rather than by
+    # copy-on-write batches
+    target = size - int(size * case["deleted"])
+    while len(indexed) > target:
+        batch = min(DELETE_BATCH, len(indexed) - target)
+        indexed.delete(rng.randrange(size) for _ in range(batch))
+    result["rows"], result["live_rows"] = size, len(indexed)
+
+    pages = max(-(-size // page_size), 1)
+    queries = case["queries"]
+    for depth, (lo, hi) in OFFSETS.items():
+        first, last = int(pages * lo), int(pages * hi)
+        for name, call in (
+            ("get_page", lambda page: server.get_page(page + 1, page_size)),
+            ("get_hyper", lambda page: server.get_hyper(page + 1,
+                                                        page_size)),
+        ):
+            result["{}_{}".format(name, depth)] = latencies(
+                call, first, last, queries, rng)
+        result["get_hyper_index_{}".format(depth)] = latencies(
+            lambda index: deletions.get_hyper_index(index, page_size),
+            int(size * lo), int(size * hi), queries, rng)
+
+    result["throughput_pages_per_s"] = {
+        str(threads): throughput(
+            lambda page: server.get_hyper(page, page_size), pages, threads,
+            case["seconds"])
+        for threads in case["threads"]
+    }
+    result["peak_rss_bytes"] = peak_rss()
+    return result
+
+
+def flatten(value, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of ``value`` by dotted path."""
+    if isinstance(value, dict):
+        leaves = {}
+        for key, item in value.items():
+            leaves.update(flatten(item, prefix + key + "."))
+        return leaves
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix[:-1]: value}
+    return {}
+
+
+def regressions(results: List[dict], baseline: List[dict],
+                tolerance: float) -> List[str]:
+    """Metrics of ``results`` worse than in ``baseline`` by more than
+    ``tolerance`` (a fraction)."""
+    def key(case: dict) -> tuple:
+        return case["rows"], case["mode"], case["deleted"]
+
+    before = {key(case): flatten(case) for case in baseline}
+    found = []
+    for case in results:
+        old = before.get(key(case), {})
+        for metric, value in flatten(case).items():
+            reference = old.get(metric)
+            if not reference:
+                continue
+            change = value / reference - 1
+            if metric.startswith("throughput"):
+                worse = -change > tolerance
+            else:
+                worse = metric.endswith(LOWER_IS_BETTER) and \
+                    change > tolerance
+            if worse:
+                found.append("{} {}: {:.4g} -> {:.4g} ({:+.0%})".format(
+                    key(case), metric, reference, value, change))
+    return found
+
+
+def integers(text: str) -> List[int]:
+    """Parse ``"10000,1e6"`` as ``[10000, 1000000]``."""
+    return [int(float(item)) for item in text.split(",")]
+
+
+def main() -> None:
+    """Run every case in its own process and report them as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=integers,
+                        default=[10000, 100000, 1000000],
+                        help="dataset sizes, e.g. 1e4,1e6,5e7")
+    parser.add_argument("--modes", default="eager,columnar,mmap")
+    parser.add_argument("--deleted", default="0,0.9",
+                        help="fractions of rows deleted at random")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threads", type=integers, default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--workdir", default=os.path.join(
+        tempfile.gettempdir(), "pagination_bench"))
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        json.dump(measure(json.loads(args.case)), sys.stdout)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in args.rows:
+        path = dataset_file(args.workdir, rows)
+        for mode in args.modes.split(","):
+            for deleted in (float(item) for item in args.deleted.split(",")):
+                case = {"path": path, "mode": mode, "deleted": deleted,
+                        "page_size": args.page_size,
+                        "queries": args.queries, "threads": args.threads,
+                        "seconds": args.seconds}
+                print("rows: {}, mode: {}, deleted: {}".format(
+                    rows, mode, deleted), file=sys.stderr)
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__),
+                     "--case", json.dumps(case)],
+                    stdout=subprocess.PIPE, check=True).stdout
+                results.append(json.loads(output))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f)["results"],
+                                args.tolerance)
+        for line in found:
+            print("regression: " + line, file=sys.stderr)
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Latency of name-prefix search on the hypermedia server.
+
+Times ``search_prefix`` for random one- to three-letter prefixes of
+names in the data and reports the index build time and the p50, p99
+and maximum latency per page.
+
+Usage: prefix_bench.py [CSV | --rows N] [--queries N] [--page N]
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from synth import write_csv  # noqa: E402
+
+Server = importlib.import_module("2-hypermedia_pagination").Server
+
+
+def percentile(samples, fraction: float) -> float:
+    """Value below which ``fraction`` of the sorted ``samples`` fall."""
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def main() -> None:
+    """Run the benchmark on a given or generated CSV."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--mode", default="columnar")
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=10)
+    args = parser.parse_args()
+    path = args.csv
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "Popular_Baby_Names.csv")
+        write_csv(path, args.rows)
+    Server.DATA_FILE = path
+    server = Server(args.mode)
+    server.dataset()
+    start = time.perf_counter()
+    index = server.prefix_index()
+    build = time.perf_counter() - start
+    print("file: {}, rows: {}, names: {}, build: {:.2f}s".format(
+        path, len(index.ids), len(index.keys), build))
+
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(args.queries):
+        name = rng.choice(index.keys)
+        prefix = name[:rng.randint(1, 3)]
+        start = time.perf_counter()
+        server.search_prefix(prefix, args.page, args.page_size)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print("{:>8} {:>8} {:>8}  (ms, page {} of {} rows)".format(
+        "p50", "p99", "max", args.page, args.page_size))
+    print("{:>8.3f} {:>8.3f} {:>8.3f}".format(
+        percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3,
+        latencies[-1] * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Synthetic Popular_Baby_Names.csv generator for benchmarks.
+"""
+import csv
+import random
+import sys
+from typing import List
+
+HEADER = ["Year of Birth", "Gender", "Ethnicity", "Child's First Name",
+          "Count", "Rank"]
+GENDERS = ["FEMALE", "MALE"]
+ETHNICITIES = ["ASIAN AND PACIFIC ISLANDER", "BLACK NON HISPANIC",
+               "HISPANIC", "WHITE NON HISPANIC"]
+SYLLABLES = ["a", "bel", "ca", "da", "el", "fi", "ga", "han", "is", "ja",
+             "ka", "li", "ma", "na", "ol", "pa", "ri", "sa", "ta", "vi",
+             "wyn", "xa", "ya", "zo"]
+
+
+def names(count: int, seed: int = 0) -> List[str]:
+    """Return ``count`` distinct, name-like strings."""
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        parts = rng.randint(2, 4)
+        name = "".join(rng.choice(SYLLABLES) for _ in range(parts))
+        seen.add(name.capitalize())
+    return sorted(seen)
+
+
+def write_csv(path: str, rows: int, seed: int = 0,
+              distinct_names: int = 5000) -> None:
+    """Write ``rows`` synthetic data rows (plus the header) to ``path``."""
+    rng = random.Random(seed)
+    pool = names(min(distinct_names, max(rows, 1)), seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for _ in range(rows):
+            writer.writerow([
+                rng.randint(2011, 2019),
+                rng.choice(GENDERS),
+                rng.choice(ETHNICITIES),
+                rng.choice(pool),
+                int(rng.paretovariate(1.2) * 10),
+                rng.randint(1, 100),
+            ])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: synth.py OUTPUT.csv ROWS")
+    write_csv(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Columnar, array-backed storage for CSV datasets.
+
+Instead of one list of strings per row, each column is stored once:
+
+- integer columns in the narrowest ``array`` typecode that fits,
+- low-cardinality text columns (gender, ethnicity) as small-int codes
+  into a list of interned categories,
+- other text columns (names) as codes into one UTF-8 string pool.
+
+Rows are only materialized, as lists of strings identical to what
+``csv.reader`` returns, for the slice being served.
+"""
+import csv
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from row_index import RowIndex
+
+
+CATEGORICAL_MAX = 1 << 8
+BUILD_CHUNK = 1 << 16
+INT_TYPECODES = ("b", "h", "i", "q")
+
+# Column buffers: arrays, or memoryviews over a snapshot file
+Buffer = Union[array, memoryview]
+
+
+def int_typecode(low: int, high: int) -> str:
+    """Narrowest signed typecode holding every value in [low, high]."""
+    for typecode in INT_TYPECODES:
+        bits = 8 * array(typecode).itemsize - 1
+        if -(1 << bits) <= low and high < (1 << bits):
+            return typecode
+    return "q"
+
+
+def code_typecode(cardinality: int) -> str:
+    """Narrowest unsigned typecode able to hold ``cardinality`` codes."""
+    if cardinality <= 1 << 8:
+        return "B"
+    if cardinality <= 1 << 16:
+        return "H"
+    return "I"
+
+
+def encode_pool(strings: Iterable[str]) -> Tuple[bytes, array]:
+    """Concatenate ``strings`` as UTF-8 and return (pool, offsets)."""
+    pool = bytearray()
+    pool_offsets = array("Q", [0])
+    for value in strings:
+        pool += value.encode("utf-8")
+        pool_offsets.append(len(pool))
+    if len(pool) < 1 << 32:
+        pool_offsets = array("I", pool_offsets)
+    return bytes(pool), pool_offsets
+
+
+def typecode_of(values: Buffer) -> str:
+    """Typecode of an ``array`` or format of a ``memoryview``."""
+    return getattr(values, "typecode", None) or values.format
+
+
+def concat(values: Buffer, tail: Iterable[int], typecode: str) -> array:
+    """A new ``typecode`` array of ``values`` (an array or a memoryview,
+    copied as raw bytes when the typecode matches) then ``tail``."""
+    if typecode_of(values) == typecode:
+        out = array(typecode)
+        out.frombytes(memoryview(values).cast("B"))
+    else:
+        out = array(typecode, values)
+    out.extend(tail)
+    return out
+
+
+class IntColumn:
+    """Column of integers, rendered back to text on access."""
+    kind = "int"
+
+    def __init__(self, name: str, values: Buffer):
+        self.name = name
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.values[i])
+
+    def slice(self, start: int, stop: int) -> List[str]:
+        """Text values of rows ``[start, stop)``."""
+        return list(map(str, self.values[start:stop]))
+
+    def appended(self, values: Sequence[str]) -> Optional["IntColumn"]:
+        """This column followed by ``values``, or None if they are not
+        all integers that round-trip through ``int``."""
+        try:
+            ints = [int(value) for value in values]
+        except ValueError:
+            return None
+        if list(map(str, ints)) != list(values):
+            return None
+        typecode = typecode_of(self.values)
+        if ints:
+            # Widen (copying the column) if a new value needs it
+            typecode = max(typecode, int_typecode(min(ints), max(ints)),
+                           key=INT_TYPECODES.index)
+        try:
+            return IntColumn(self.name, concat(self.values, ints, typecode))
+        except OverflowError:
+            return None  # beyond 64 bits
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return len(self.values) * self.values.itemsize
+
+
+class CategoricalColumn:
+    """Column of small-int codes into a list of interned categories."""
+    kind = "cat"
+
+    def __init__(self, name: str, codes: Buffer, categories: List[str]):
+        self.name = name
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.categories[self.codes[i]]
+
+    def slice(self, start: int, stop: int) -> List[str]:
+        """Text values of rows ``[start, stop)``."""
+        categories = self.categories
+        return [categories[code] for code in self.codes[start:stop]]
+
+    def string(self, code: int) -> str:
+        """Category of ``code``."""
+        return self.categories[code]
+
+    def appended(self,
+                 values: Sequence[str]) -> Optional["CategoricalColumn"]:
+        """This column followed by ``values``, or None if they bring it
+        over ``CATEGORICAL_MAX`` categories."""
+        categories = self.categories
+        table = {value: code for code, value in enumerate(categories)}
+        new = [value for value in dict.fromkeys(values)
+               if value not in table]
+        if new:
+            if len(categories) + len(new) > CATEGORICAL_MAX:
+                return None
+            categories = categories + new
+            for value in new:
+                table[value] = len(table)
+        codes = concat(self.codes, map(table.__getitem__, values),
+                       code_typecode(len(categories)))
+        return CategoricalColumn(self.name, codes, categories)
+
+    @property
+    def cardinality(self) -> int:
+        """Number of distinct values."""
+        return len(self.categories)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the code buffer."""
+        return len(self.codes) * self.codes.itemsize
+
+
+class StringColumn:
+    """Column of codes into a string table held as one UTF-8 pool."""
+    kind = "str"
+
+    def __init__(self, name: str, codes: Buffer,
+                 pool: Union[bytes, memoryview], pool_offsets: Buffer,
+                 table: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.codes = codes
+        self.pool = pool
+        self.pool_offsets = pool_offsets
+        self.table = table  # string -> code, built on the first append
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.string(self.codes[i])
+
+    def slice(self, start: int, stop: int) -> List[str]:
+        """Text values of rows ``[start, stop)``."""
+        return [self.string(code) for code in self.codes[start:stop]]
+
+    def string(self, code: int) -> str:
+        """Decode entry ``code`` of the string table."""
+        start, end = self.pool_offsets[code], self.pool_offsets[code + 1]
+        return str(self.pool[start:end], "utf-8")
+
+    def appended(self, values: Sequence[str]) -> "StringColumn":
+        """This column followed by ``values``.
+
+        New strings are added at the end of the pool; the string table
+        is shared with this column until one is.
+        """
+        table = self.table
+        if table is None:
+            table = self.table = {self.string(code): code
+                                  for code in range(self.cardinality)}
+        new = [value for value in dict.fromkeys(values)
+               if value not in table]
+        pool, pool_offsets = self.pool, self.pool_offsets
+        if new:
+            table = dict(table)
+            for value in new:
+                table[value] = len(table)
+            extra, extra_offsets = encode_pool(new)
+            typecode = typecode_of(pool_offsets)
+            if len(pool) + len(extra) >= 1 << 32:
+                typecode = "Q"
+            pool_offsets = concat(pool_offsets, (
+                len(pool) + offset for offset in extra_offsets[1:]),
+                typecode)
+            pool = bytes(pool) + extra
+        codes = concat(self.codes, map(table.__getitem__, values),
+                       code_typecode(len(table)))
+        return StringColumn(self.name, codes, pool, pool_offsets, table)
+
+    @property
+    def cardinality(self) -> int:
+        """Number of distinct strings in the table."""
+        return len(self.pool_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the codes, the pool and its offsets."""
+        return (len(self.codes) * self.codes.itemsize + len(self.pool)
+                + len(self.pool_offsets) * self.pool_offsets.itemsize)
+
+
+Column = Union[IntColumn, CategoricalColumn, StringColumn]
+
+
+class ColumnBuilder:
+    """Accumulate the values of one column and pick its storage.
+
+    A column stays integer while every value round-trips exactly
+    through ``int`` and fits in 64 bits; the first value that does not
+    turns it into a dictionary-encoded text column.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ints = array("q")
+        self.table = None
+        self.codes = None
+
+    def extend(self, values: Sequence[str]) -> None:
+        """Append a chunk of text values."""
+        if self.ints is not None:
+            try:
+                ints = [int(value) for value in values]
+                if list(map(str, ints)) == list(values):
+                    self.ints.extend(array("q", ints))
+                    return
+            except (ValueError, OverflowError):
+                pass
+            self._to_text()
+        table = self.table
+        for value in dict.fromkeys(values):
+            if value not in table:
+                table[value] = len(table)
+        self.codes.extend(map(table.__getitem__, values))
+
+    def extend_column(self, column: Column) -> None:
+        """Append a finished column built from a later chunk of rows.
+
+        Text columns are merged by remapping their codes onto this
+        builder's table, without materializing their values.
+        """
+        if column.kind == "int":
+            if self.ints is not None:
+                self.ints.extend(array("q", column.values))
+            else:
+                self.extend(column.slice(0, len(column)))
+            return
+        if self.ints is not None:
+            self._to_text()
+        table = self.table
+        remap = []
+        for code in range(column.cardinality):
+            value = column.string(code)
+            if value not in table:
+                table[value] = len(table)
+            remap.append(table[value])
+        self.codes.extend(map(remap.__getitem__, column.codes))
+
+    def finish(self) -> Column:
+        """Return the finished, narrowed column."""
+        if self.ints is not None:
+            ints = self.ints
+            low, high = (min(ints), max(ints)) if ints else (0, 0)
+            return IntColumn(self.name, array(int_typecode(low, high),
+                                              ints))
+        categories = list(self.table)
+        codes = array(code_typecode(len(categories)), self.codes)
+        if len(categories) <= CATEGORICAL_MAX:
+            return CategoricalColumn(self.name, codes, categories)
+        pool, pool_offsets = encode_pool(categories)
+        return StringColumn(self.name, codes, pool, pool_offsets)
+
+    def _to_text(self) -> None:
+        """Switch to dictionary encoding, re-encoding earlier ints."""
+        self.table = {}
+        self.codes = array("I")
+        ints, self.ints = self.ints, None
+        self.extend([str(value) for value in ints])
+
+
+class ColumnarDataset(Sequence):
+    """Rows stored column by column, materialized on access."""
+
+    def __init__(self, header: List[str], columns: List[Column], nrows: int,
+                 row_offsets: Optional[Buffer] = None,
+                 source: Optional[object] = None):
+        self.header = header
+        self.columns = columns
+        self.row_offsets = row_offsets
+        self._nrows = nrows
+        self._source = source  # keeps a backing mmap alive, if any
+
+    def __len__(self) -> int:
+        return self._nrows
+
+    def __getitem__(self, i: Union[int, slice]
+                    ) -> Union[List[str], List[List[str]]]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nrows)
+            if step != 1:
+                return [self._row(j) for j in range(start, stop, step)]
+            return self.rows(start, stop)
+        if i < 0:
+            i += self._nrows
+        if not 0 <= i < self._nrows:
+            raise IndexError("row index out of range")
+        return self._row(i)
+
+    def rows(self, start: int, stop: int) -> List[List[str]]:
+        """Materialize the rows in ``[start, stop)``."""
+        if start >= stop:
+            return []
+        return [list(row) for row in
+                zip(*(column.slice(start, stop) for column in self.columns))]
+
+    def column(self, name: str) -> Column:
+        """Column called ``name``."""
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise KeyError(name)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return sum(column.nbytes for column in self.columns)
+
+    def _row(self, i: int) -> List[str]:
+        return [column[i] for column in self.columns]
+
+    def appended(self, rows: List[List[str]]) -> "ColumnarDataset":
+        """A new dataset holding these rows followed by ``rows``.
+
+        Only ``rows`` are encoded: each column's buffers are copied as
+        raw bytes and the new codes or values appended, and string
+        tables are reused. A column that must change its storage (text
+        in an integer column, too many categories) is rebuilt. This
+        dataset is left untouched.
+
+        Raises:
+            ValueError: If a row does not have as many fields as the
+                header.
+        """
+        width = len(self.header)
+        for i, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError("row {} has {} fields, expected {}".format(
+                    self._nrows + i, len(row), width))
+        columns = []
+        for column, values in zip(self.columns, zip(*rows)):
+            extended = column.appended(values)
+            if extended is None:
+                builder = ColumnBuilder(column.name)
+                builder.extend_column(column)
+                builder.extend(values)
+                extended = builder.finish()
+            columns.append(extended)
+        if not rows:
+            columns = self.columns
+        return type(self)(self.header, columns, self._nrows + len(rows))
+
+    @classmethod
+    def from_rows(cls, header: List[str], chunks: Iterable[List[List[str]]],
+                  row_offsets: Optional[Buffer] = None
+                  ) -> "ColumnarDataset":
+        """Build a dataset from chunks of parsed rows.
+
+        Raises:
+            ValueError: If a row does not have as many fields as the
+                header, since such data has no columnar form.
+        """
+        width = len(header)
+        builders = [ColumnBuilder(name) for name in header]
+        nrows = 0
+        for chunk in chunks:
+            if any(len(row) != width for row in chunk):
+                bad = next(i for i, row in enumerate(chunk)
+                           if len(row) != width)
+                raise ValueError("row {} has {} fields, expected {}".format(
+                    nrows + bad, len(chunk[bad]), width))
+            nrows += len(chunk)
+            if width:
+                for builder, values in zip(builders, zip(*chunk)):
+                    builder.extend(values)
+        columns = [builder.finish() for builder in builders]
+        return cls(header, columns, nrows, row_offsets)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ColumnarDataset":
+        """Parse the CSV at ``path`` (header first) into columns."""
+        with open(path, newline="", encoding=RowIndex.ENCODING) as f:
+            header = next(csv.reader(f), [])
+        rows = RowIndex(path, persist=False)
+        chunks = (rows.rows(start, start + BUILD_CHUNK)
+                  for start in range(0, len(rows), BUILD_CHUNK))
+        try:
+            return cls.from_rows(header, chunks, rows.offsets)
+        finally:
+            rows.close()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Opaque, signed keyset cursors for pagination.
+
+A cursor carries the key of the last row a client has seen together
+with the query it was produced for, serialized as URL-safe base64 JSON
+and signed with HMAC-SHA256. The server keeps no state per cursor; any
+process sharing the secret can continue the listing.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Sequence
+
+CURSOR_VERSION = 1
+SECRET_ENV = "PAGINATION_CURSOR_SECRET"
+SIGNATURE_BYTES = 16
+# Used when the environment provides no secret: cursors then only
+# verify in the process that issued them.
+_PROCESS_SECRET = os.urandom(32)
+
+
+def default_secret() -> bytes:
+    """Secret from ``$PAGINATION_CURSOR_SECRET``, else a per-process one."""
+    secret = os.environ.get(SECRET_ENV)
+    return secret.encode("utf-8") if secret else _PROCESS_SECRET
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(body: str, secret: bytes) -> str:
+    digest = hmac.new(secret, body.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest[:SIGNATURE_BYTES])
+
+
+def encode_cursor(payload: Dict[str, Any],
+                  secret: Optional[bytes] = None) -> str:
+    """Serialize and sign ``payload``."""
+    payload = dict(payload, v=CURSOR_VERSION)
+    body = _b64encode(json.dumps(payload, separators=(",", ":"),
+                                 sort_keys=True).encode("utf-8"))
+    return "{}.{}".format(body, _sign(body, secret or default_secret()))
+
+
+def decode_cursor(cursor: str, secret: Optional[bytes] = None
+                  ) -> Dict[str, Any]:
+    """Verify and deserialize a cursor made by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed, was signed with another
+            secret, or comes from another cursor version.
+    """
+    cursor = str(cursor)
+    if not cursor.isascii():
+        # Neither signable nor comparable: never a cursor of ours
+        raise ValueError("invalid cursor")
+    body, _, signature = cursor.partition(".")
+    if not hmac.compare_digest(signature,
+                               _sign(body, secret or default_secret())):
+        raise ValueError("invalid cursor")
+    try:
+        payload = json.loads(_b64decode(body).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("invalid cursor")
+    return payload
+
+
+def seek_after(ids: Sequence[int], key: Callable[[int], int], last: int,
+               descending: bool = False) -> int:
+    """Position of the first id ordered strictly after key ``last``.
+
+    ``ids`` must be ordered by ``key`` (ascending, or descending when
+    ``descending`` is set); the search is a binary search.
+    """
+    lo, hi = 0, len(ids)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        k = key(ids[mid])
+        if (k > last) if not descending else (k < last):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Dataset loading strategies shared by the pagination servers.
+"""
+import csv
+from functools import partial
+from typing import Iterable, List, Optional, Sequence, Union
+
+from columnar import ColumnarDataset
+from parallel_csv import read_columnar_parallel, read_csv_parallel
+from row_index import RowIndex
+from sharded_dataset import ShardedDataset
+from snapshot import load_snapshot
+
+
+MODES = ("eager", "mmap", "columnar", "snapshot")
+
+
+def load_dataset(path: Union[str, Sequence[str]], mode: str = "eager",
+                 workers: Optional[int] = 1) -> Sequence[List[str]]:
+    """Load the data rows of a CSV file, without its header.
+
+    Args:
+        path (str): Path of the CSV file. A list of paths is loaded as
+            one ``ShardedDataset``: their rows end to end, each file
+            loaded in ``mode`` only when its rows are first read.
+        mode (str): ``"eager"`` parses the whole file into a list of
+            rows. ``"mmap"`` memory-maps the file and keeps only a
+            row-offset index; rows are parsed when they are accessed.
+            ``"columnar"`` parses the file into array-backed columns
+            and materializes rows only for the slice being served.
+            ``"snapshot"`` opens the binary snapshot next to the file
+            (``<file>.snap``), rebuilding it first if it is missing or
+            stale; rows are materialized from its typed columns.
+        workers (int): Processes used to parse the file in the
+            ``"eager"`` and ``"columnar"`` modes; ``None`` means one
+            per CPU (see ``parallel_csv``).
+
+    Returns:
+        Sequence[List[str]]: The rows, supporting ``len`` and slicing.
+    """
+    if not isinstance(path, str) and mode in MODES:
+        return ShardedDataset(path, partial(load_dataset, mode=mode,
+                                            workers=workers))
+    if mode == "eager" and workers != 1:
+        return read_csv_parallel(path, workers)
+    if mode == "eager":
+        with open(path) as f:
+            reader = csv.reader(f)
+            dataset = [row for row in reader]
+        return dataset[1:]  # Skip the header row
+    if mode == "mmap":
+        return RowIndex(path)
+    if mode == "columnar" and workers != 1:
+        return read_columnar_parallel(path, workers)
+    if mode == "columnar":
+        return ColumnarDataset.from_csv(path)
+    if mode == "snapshot":
+        return load_snapshot(path)
+    raise ValueError("mode must be one of {}".format(", ".join(MODES)))
+
+
+def take_rows(rows: Sequence[List[str]],
+              positions: Iterable[int]) -> List[List[str]]:
+    """Rows at ``positions``, reading contiguous runs as one slice.
+
+    Lazy datasets parse or materialize a slice in one go, so grouping
+    consecutive positions keeps sparse reads cheap.
+    """
+    taken = []
+    run_start = run_end = None
+    for position in positions:
+        if position == run_end:
+            run_end += 1
+            continue
+        if run_start is not None:
+            taken.extend(rows[run_start:run_end])
+        run_start, run_end = position, position + 1
+    if run_start is not None:
+        taken.extend(rows[run_start:run_end])
+    return taken
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+A dataset that follows changes to its CSV file.
+
+When the file grows by whole rows (an append), only the new bytes are
+parsed and the rows are added to the loaded dataset. Any other change
+(a rewrite, truncation or edit) reloads the file on a background
+thread while the previous dataset keeps serving.
+
+Datasets are never modified in place: every change publishes a new
+dataset object, so a caller holding one keeps a consistent view.
+Rewrites should replace the file atomically (write a temporary file,
+then ``os.replace`` it), above all in the ``"mmap"`` mode, which reads
+rows from the file itself. A list of files (see ``sharded_dataset``)
+is reloaded whenever any of them changes.
+"""
+import csv
+import io
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import List, Optional, Sequence, Tuple, Union
+
+from dataset_loader import load_dataset
+
+ENCODING = "utf-8"
+CHECK_BYTES = 1 << 12
+LOAD_ATTEMPTS = 3
+
+
+class DatasetSource:
+    """Loaded dataset of a CSV file, kept in sync with the file.
+
+    ``watch`` is the minimum number of seconds between two checks of
+    the file; ``None`` loads the file once and never checks it again.
+    ``generation`` grows by one on every full reload; appends keep it,
+    since row ids stay valid.
+    """
+
+    def __init__(self, path: Union[str, Sequence[str]], mode: str = "eager",
+                 workers: Optional[int] = 1, watch: Optional[float] = None):
+        self.path = path
+        self.mode = mode
+        self.workers = workers
+        self.watch = watch
+        self.generation = 0
+        self._dataset = None
+        self._published = (None, 0)
+        self._stat = None      # (size, mtime_ns) the dataset reflects
+        self._end = 0          # bytes of the file parsed so far
+        self._checksum = 0     # crc32 of the bytes just before _end
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._reloading = None
+
+    def current(self) -> Sequence[List[str]]:
+        """The dataset, after checking the file if it is time to."""
+        return self.state()[0]
+
+    def state(self) -> Tuple[Sequence[List[str]], int]:
+        """The dataset and its generation, read consistently."""
+        if self._dataset is None:
+            with self._lock:
+                if self._dataset is None:
+                    self._load()
+        elif self.watch is not None and \
+                time.monotonic() - self._checked >= self.watch:
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._check()
+                finally:
+                    self._lock.release()
+        return self._published
+
+    def refresh(self, wait: bool = False) -> None:
+        """Check the file now; with ``wait``, also wait for a reload."""
+        with self._lock:
+            if self._dataset is None:
+                self._load()
+            else:
+                self._check()
+            reloading = self._reloading
+        if wait and reloading is not None:
+            reloading.join()
+
+    def _load(self) -> None:
+        """Load the whole file and publish it as a new generation.
+
+        A file that keeps changing while it is read is not read until it
+        settles: after ``LOAD_ATTEMPTS`` reads, the last one is published
+        with the offset where its rows end, so that the next check adds
+        what was appended since (or reloads, if that offset is unknown).
+        """
+        for _ in range(LOAD_ATTEMPTS):
+            before = self._file_stat()
+            dataset = load_dataset(self.path, self.mode, self.workers)
+            if self._file_stat() == before:
+                self._publish(dataset, before, self.generation + 1)
+                return
+        if not isinstance(self.path, str):
+            self._publish(dataset, None, self.generation + 1)
+            return
+        end = self._rows_end(len(dataset))
+        if hasattr(dataset, "extended") and dataset.offsets[-1] != end:
+            end = None  # It ends mid-row, where extended() cannot go on
+        self._publish(dataset, None, self.generation + 1, end or 0)
+        if end is None:
+            self._checksum = None  # Fails _appended: the next check reloads
+
+    def _check(self) -> None:
+        """Follow the file if it changed since the last check."""
+        self._checked = time.monotonic()
+        if self._reloading is not None:
+            return
+        stat = self._file_stat()
+        if stat == self._stat:
+            return
+        if isinstance(self.path, str) and stat[0] > self._end and \
+                self._appended():
+            try:
+                # Also when only a partial row was written: it waits
+                # for the next check rather than forcing a reload
+                self._extend(stat)
+                return
+            except ValueError:
+                pass  # e.g. rows of another width: reload instead
+        self._reloading = threading.Thread(
+            target=self._reload, name="dataset-reload", daemon=True)
+        self._reloading.start()
+
+    def _reload(self) -> None:
+        try:
+            self._load()
+        finally:
+            self._reloading = None
+
+    def _appended(self) -> bool:
+        """True if the parsed bytes are still the file's prefix."""
+        with open(self.path, "rb") as f:
+            start = max(self._end - CHECK_BYTES, 0)
+            f.seek(start)
+            tail = f.read(self._end - start)
+        return (not tail or tail.endswith(b"\n")) and \
+            zlib.crc32(tail) == self._checksum
+
+    def _extend(self, stat: Tuple[int, int]) -> bool:
+        """Add the complete rows appended after ``_end``.
+
+        A trailing partial row (the writer is mid-append) is left for
+        the next check. Returns False if nothing could be added yet.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self._end)
+            data = f.read(stat[0] - self._end)
+        cut = len(data)
+        while cut:
+            cut = data.rfind(b"\n", 0, cut) + 1
+            if not data.count(b'"', 0, cut) % 2:
+                break
+            cut -= 1
+        if not cut:
+            return False
+        end = self._end + cut
+        dataset = self._dataset
+        if hasattr(dataset, "extended"):
+            dataset = dataset.extended(end)
+        else:
+            rows = list(csv.reader(io.StringIO(
+                data[:cut].decode(ENCODING), newline="")))
+            if hasattr(dataset, "appended"):
+                dataset = dataset.appended(rows)
+            else:
+                dataset = dataset + rows
+        self._publish(dataset, stat if end == stat[0] else None,
+                      self.generation, end)
+        return True
+
+    def _rows_end(self, rows: int) -> Optional[int]:
+        """Offset just after the header and ``rows`` complete rows of the
+        file, or None if it does not hold that many."""
+        with open(self.path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                quoted = mm.find(b'"') != -1
+                in_quotes = False
+                pos, left = 0, rows + 1
+                while left:
+                    end = mm.find(b"\n", pos)
+                    if end == -1:
+                        return None
+                    end += 1
+                    if quoted and mm[pos:end].count(b'"') % 2:
+                        in_quotes = not in_quotes
+                    if not in_quotes:
+                        left -= 1
+                    pos = end
+        return pos
+
+    def _publish(self, dataset: Sequence[List[str]],
+                 stat: Optional[Tuple], generation: int,
+                 end: Optional[int] = None) -> None:
+        """Make ``dataset`` the one served; ``end`` defaults to the
+        size in ``stat``."""
+        if isinstance(self.path, str):
+            self._end = stat[0] if end is None else end
+            with open(self.path, "rb") as f:
+                start = max(self._end - CHECK_BYTES, 0)
+                f.seek(start)
+                self._checksum = zlib.crc32(f.read(self._end - start))
+        self._stat = stat
+        self._dataset = dataset
+        self.generation = generation
+        self._published = (dataset, generation)
+        self._checked = time.monotonic()
+
+    def _file_stat(self) -> Tuple:
+        """(size, mtime_ns) of the file, or a tuple of them per file."""
+        if not isinstance(self.path, str):
+            return tuple(self._stat_of(path) for path in self.path)
+        return self._stat_of(self.path)
+
+    @staticmethod
+    def _stat_of(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
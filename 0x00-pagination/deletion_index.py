@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Deletion index for deletion-resilient pagination.
+"""
+import copy
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from dataset_loader import take_rows
+
+
+class DeletableRows(Mapping):
+    """Rows keyed by position, with deletions tracked in a bitmap.
+
+    Slots are numbered from 0 like the original dict-of-rows, and
+    deleted slots keep their number, so clients paginating by index do
+    not miss rows. A Fenwick tree over per-block live counts gives
+    rank/select in O(log n): finding the next N live rows after any
+    index costs O(log n + N) however many rows were deleted before it.
+
+    The object behaves like the ``Dict[int, List]`` it replaces
+    (``get``, ``[]``, ``del``, ``len``, iteration over live indices).
+    """
+    BLOCK = 64
+
+    def __init__(self, rows: Sequence, ids: Optional[array] = None):
+        """Index ``rows``; ``ids`` maps slots to row positions."""
+        self._rows = rows
+        self._ids = ids
+        size = len(ids) if ids is not None else len(rows)
+        self._flags = bytearray(b"\x01") * size
+        self._live = size
+        self._layout = object()
+        self._compactions = 0
+        self._build_tree()
+
+    @property
+    def layout(self) -> object:
+        """Token shared by every copy that numbers slots the same way.
+
+        ``compacted`` renumbers the slots and replaces it.
+        """
+        return self._layout
+
+    @property
+    def compactions(self) -> int:
+        """How many times the slots were renumbered since the rows were
+        first indexed."""
+        return self._compactions
+
+    @property
+    def rows(self) -> Sequence:
+        """The indexed row sequence."""
+        return self._rows
+
+    @property
+    def size(self) -> int:
+        """Number of slots, deleted ones included."""
+        return len(self._flags)
+
+    def __len__(self) -> int:
+        """Number of live rows."""
+        return self._live
+
+    def __contains__(self, i: object) -> bool:
+        return isinstance(i, int) and 0 <= i < self.size and \
+            self._flags[i] == 1
+
+    def __getitem__(self, i: int) -> List:
+        if i not in self:
+            raise KeyError(i)
+        return self._rows[self._position(i)]
+
+    def __delitem__(self, i: int) -> None:
+        if not self.delete([i]):
+            raise KeyError(i)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over live indices in order."""
+        return compress(range(self.size), self._flags)
+
+    def delete(self, indices: Iterable[int]) -> int:
+        """Delete every live index in ``indices``.
+
+        Returns:
+            int: How many rows were actually deleted.
+        """
+        flags = self._flags
+        block_size = self.BLOCK
+        per_block = {}
+        for i in indices:
+            if 0 <= i < len(flags) and flags[i]:
+                flags[i] = 0
+                block = i // block_size
+                per_block[block] = per_block.get(block, 0) + 1
+        deleted = sum(per_block.values())
+        self._live -= deleted
+        if len(per_block) > len(self._tree) // 8:
+            self._build_tree()
+        else:
+            for block, count in per_block.items():
+                self._add(block, -count)
+        return deleted
+
+    def deleted(self, indices: Iterable[int]) -> "DeletableRows":
+        """A copy of this index with ``indices`` deleted.
+
+        Only the bitmap and the tree are copied; the rows and the slot
+        map are shared. This index is left untouched, so readers
+        holding it keep a consistent view.
+        """
+        new = copy.copy(self)
+        new._flags = bytearray(self._flags)
+        new._tree = array(self._tree.typecode, self._tree)
+        new.delete(indices)
+        return new
+
+    def compacted(self) -> "DeletableRows":
+        """A copy of this index without its deleted slots, the live rows
+        renumbered from 0.
+
+        Indices handed out before compaction no longer refer to the
+        same rows in the copy. This index is left untouched.
+        """
+        positions = range(len(self._rows)) if self._ids is None \
+            else self._ids
+        typecode = "I" if len(self._rows) < 2 ** 32 else "Q"
+        new = DeletableRows(self._rows,
+                            array(typecode, compress(positions, self._flags)))
+        new._compactions = self._compactions + 1
+        return new
+
+    def extended(self, rows: Sequence) -> "DeletableRows":
+        """Deletion index over ``rows``: these rows with more appended.
+
+        Deletions carry over and the appended rows are live. This
+        index is left untouched.
+        """
+        added = len(rows) - len(self._rows)
+        new = copy.copy(self)
+        new._rows = rows
+        if self._ids is not None:
+            new._ids = array(self._ids.typecode, self._ids)
+            new._ids.extend(range(len(self._rows), len(rows)))
+        new._flags = self._flags + b"\x01" * added
+        new._live = self._live + added
+        new._build_tree()
+        return new
+
+    def rank(self, i: int) -> int:
+        """Number of live rows in slots ``[0, i)``."""
+        i = min(max(i, 0), self.size)
+        block = i // self.BLOCK
+        return self._prefix(block) + \
+            self._flags.count(1, block * self.BLOCK, i)
+
+    def select(self, k: int) -> int:
+        """Slot of the ``k``-th live row (0-based)."""
+        if not 0 <= k < self._live:
+            raise IndexError("rank out of range")
+        tree = self._tree
+        block = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = block + step
+            if nxt < len(tree) and tree[nxt] <= k:
+                block = nxt
+                k -= tree[nxt]
+            step >>= 1
+        pos = block * self.BLOCK
+        while True:
+            pos = self._flags.find(1, pos)
+            if not k:
+                return pos
+            k -= 1
+            pos += 1
+
+    def next_live(self, index: int, count: int) -> List[int]:
+        """Up to ``count`` live slots at or after ``index``."""
+        flags = self._flags
+        size = len(flags)
+        found = []
+        pos = max(index, 0)
+        while len(found) < count and pos < size:
+            end = min((pos // self.BLOCK + 1) * self.BLOCK, size)
+            j = flags.find(1, pos, end)
+            if j != -1:
+                found.append(j)
+                pos = j + 1
+                continue
+            # Rest of the block is deleted: jump over the gap.
+            k = self.rank(end)
+            if k >= self._live:
+                break
+            pos = self.select(k)
+        return found
+
+    def rows_at(self, slots: Sequence[int]) -> List[List]:
+        """Rows of ``slots``, reading contiguous runs as one slice."""
+        return take_rows(self._rows, self.positions(slots))
+
+    def positions(self, slots: Sequence[int]) -> List[int]:
+        """Row positions of ``slots``."""
+        if self._ids is None:
+            return list(slots)
+        return [self._ids[i] for i in slots]
+
+    def _position(self, i: int) -> int:
+        """Row position of slot ``i``."""
+        return i if self._ids is None else self._ids[i]
+
+    def _build_tree(self) -> None:
+        """Build the Fenwick tree of live counts per block in O(n)."""
+        nblocks = -(-self.size // self.BLOCK)
+        tree = array("q", bytes(8 * (nblocks + 1)))
+        for b in range(nblocks):
+            start = b * self.BLOCK
+            tree[b + 1] += self._flags.count(1, start, start + self.BLOCK)
+            parent = (b + 1) + ((b + 1) & -(b + 1))
+            if parent <= nblocks:
+                tree[parent] += tree[b + 1]
+        self._tree = tree
+
+    def _add(self, block: int, delta: int) -> None:
+        """Add ``delta`` to the live count of ``block``."""
+        i = block + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, block: int) -> int:
+        """Live rows in blocks ``[0, block)``."""
+        total = 0
+        tree = self._tree
+        while block > 0:
+            total += tree[block]
+            block -= block & -block
+        return total
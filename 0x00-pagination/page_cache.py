@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Read-through cache of page results, evicted by an ``0x01-caching`` policy.
+"""
+import importlib
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+CACHING_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "0x01-caching")
+
+
+def policy_class(name: str) -> type:
+    """The ``0x01-caching`` cache class implementing policy ``name``
+    (see its ``cache_policies.POLICIES``)."""
+    if CACHING_DIR not in sys.path:
+        sys.path.append(CACHING_DIR)
+    return importlib.import_module("cache_policies").policy_class(name)
+
+
+class PageCache:
+    """Bounded cache of page results with hit-ratio counters.
+
+    Entries are stored with a token describing the data they were
+    built from; ``get`` takes a check of that token, and an entry that
+    fails it is dropped and counted as invalidated. Evictions follow
+    the chosen policy (``FIFO``, ``LIFO``, ``LRU``, ``MRU``, ``LFU``,
+    ``TinyLFU``, ``ARC``, ``CLOCK`` or ``SIEVE``) and are silent. Safe
+    to share between threads.
+    """
+
+    def __init__(self, policy: str = "LRU", max_items: int = 128,
+                 max_bytes: Optional[int] = None,
+                 sizer: Optional[Callable[[Any], int]] = None):
+        """Hold up to ``max_items`` pages and, if set, ``max_bytes``
+        bytes of pages as measured by ``sizer`` (``sys.getsizeof`` by
+        default, which does not count the rows; see ``BaseCaching``)."""
+        assert isinstance(max_items, int) and max_items > 0, \
+            "max_items must be a positive integer"
+        self.policy = policy
+        sizer = sizer or sys.getsizeof
+        self._cache = policy_class(policy)(
+            max_items, max_bytes, lambda entry: sizer(entry[0]))
+        self._cache.on_discard = self._evicted
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidations = self.evictions = 0
+
+    def get(self, key: Hashable,
+            valid: Callable[[Any], bool] = lambda token: True) -> Any:
+        """The cached value of ``key``, or None.
+
+        ``valid`` receives the token stored with the entry and returns
+        False if the entry no longer reflects the data.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and not valid(entry[1]):
+                self._cache.discard(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, token: Any = None) -> None:
+        """Cache ``value`` for ``key``, built from data ``token``."""
+        with self._lock:
+            self._cache.put(key, (value, token))
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            for key in list(self._cache.cache_data):
+                self._cache.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, invalidation and eviction counts and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "policy": self.policy,
+                "size": len(self._cache.cache_data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._cache.cache_data)
+
+    def _evicted(self, key: Hashable) -> None:
+        self.evictions += 1
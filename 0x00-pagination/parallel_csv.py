@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Parallel, chunked CSV ingestion.
+
+The file is split at newline-aligned byte offsets, the chunks are
+parsed by a ``ProcessPoolExecutor`` and the results are returned in
+file order. Workers hand back dictionary-encoded columns rather than
+lists of strings, which are much cheaper to transfer and to merge.
+
+A newline inside a quoted field is not a valid split point: a boundary
+is only used when the number of quote characters before it is even.
+If any boundary fails that check the file is parsed serially instead,
+so quoted newlines are always handled correctly.
+"""
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from columnar import ColumnarDataset, ColumnBuilder
+
+ENCODING = "utf-8"
+MIN_CHUNK_BYTES = 1 << 20
+CHUNKS_PER_WORKER = 4
+
+
+def _parse_range(path: str, start: int, end: int) -> List[List[str]]:
+    """Parse the rows stored in bytes ``[start, end)`` of ``path``."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(ENCODING)
+    return list(csv.reader(io.StringIO(text, newline="")))
+
+
+def _encode_range(path: str, start: int, end: int) -> Tuple[int, List]:
+    """Parse bytes ``[start, end)`` of ``path`` into finished columns."""
+    rows = _parse_range(path, start, end)
+    width = len(rows[0]) if rows else 0
+    for row in rows:
+        if len(row) != width:
+            raise ValueError("row has {} fields, expected {}".format(
+                len(row), width))
+    builders = [ColumnBuilder(str(j)) for j in range(width)]
+    for builder, values in zip(builders, zip(*rows)):
+        builder.extend(values)
+    return len(rows), [builder.finish() for builder in builders]
+
+
+def _row_end(mm: mmap.mmap, pos: int) -> int:
+    """Offset just past the (possibly multi-line) row at ``pos``."""
+    in_quotes = False
+    while pos < len(mm):
+        end = mm.find(b"\n", pos)
+        end = len(mm) if end == -1 else end + 1
+        if mm[pos:end].count(b'"') % 2:
+            in_quotes = not in_quotes
+        pos = end
+        if not in_quotes:
+            break
+    return pos
+
+
+def split_ranges(path: str, chunks: int,
+                 skip_header: bool = True) -> Optional[List[Tuple[int, int]]]:
+    """Newline-aligned byte ranges covering the data rows of ``path``.
+
+    Returns None when a boundary would fall inside a quoted field; the
+    caller must then parse the file serially.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        start = _row_end(mm, 0) if skip_header else 0
+        step = max((size - start) // max(chunks, 1), 1)
+        bounds = [start]
+        while bounds[-1] < size:
+            nl = mm.find(b"\n", bounds[-1] + step)
+            bounds.append(size if nl == -1 else nl + 1)
+        if mm.find(b'"', start) != -1:
+            quotes = 0
+            for lo, hi in zip(bounds, bounds[1:-1]):
+                quotes += mm[lo:hi].count(b'"')
+                if quotes % 2:
+                    return None
+        return list(zip(bounds, bounds[1:]))
+    finally:
+        mm.close()
+
+
+def iter_chunks(path: str, workers: Optional[int] = None,
+                skip_header: bool = True) -> Iterator[Tuple[int, List]]:
+    """Yield ``(row_count, columns)`` per chunk of ``path``, in order.
+
+    ``workers`` defaults to ``os.cpu_count()``. Small files, a single
+    worker, or quoted fields spanning a boundary are parsed serially,
+    as one chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    chunks = min(workers * CHUNKS_PER_WORKER, size // MIN_CHUNK_BYTES)
+    ranges = split_ranges(path, chunks, skip_header) \
+        if workers > 1 and chunks > 1 else None
+    if ranges is None:
+        start = 0
+        if skip_header and size:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                start = _row_end(mm, 0)
+                mm.close()
+        yield _encode_range(path, start, size)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        starts, ends = zip(*ranges)
+        yield from pool.map(_encode_range, [path] * len(ranges),
+                            starts, ends)
+
+
+def read_csv_parallel(path: str, workers: Optional[int] = None,
+                      skip_header: bool = True) -> List[List[str]]:
+    """Parse the data rows of ``path`` into a list of rows.
+
+    Rows of uneven width have no columnar form; such files are parsed
+    serially like ``csv.reader`` would.
+    """
+    rows = []
+    try:
+        for nrows, columns in iter_chunks(path, workers, skip_header):
+            rows.extend(map(list, zip(*(column.slice(0, nrows)
+                                        for column in columns))))
+    except ValueError:
+        rows = _parse_range(path, 0, os.path.getsize(path))
+        return rows[1:] if skip_header else rows
+    return rows
+
+
+def read_columnar_parallel(path: str, workers: Optional[int] = None
+                           ) -> ColumnarDataset:
+    """Parse ``path`` (header first) into a ``ColumnarDataset``."""
+    with open(path, newline="", encoding=ENCODING) as f:
+        header = next(csv.reader(f), [])
+    builders = [ColumnBuilder(name) for name in header]
+    total = 0
+    for nrows, columns in iter_chunks(path, workers):
+        if nrows and len(columns) != len(header):
+            raise ValueError("row has {} fields, expected {}".format(
+                len(columns), len(header)))
+        for builder, column in zip(builders, columns):
+            builder.extend_column(column)
+        total += nrows
+    return ColumnarDataset(header, [builder.finish() for builder in builders],
+                           total)
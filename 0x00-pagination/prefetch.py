@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Background prefetching for page iterators.
+"""
+import queue
+import threading
+from typing import Any, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+_POLL = 0.05
+
+
+def prefetched(pages: Iterator[T], depth: int = 2) -> Iterator[T]:
+    """Yield from ``pages`` while a background thread runs ahead.
+
+    Up to ``depth`` pages are produced before the consumer asks for
+    them, so fetching the next page overlaps with processing the
+    current one. The buffer is bounded, and the producer stops as soon
+    as the consumer does (exhaustion, ``break``, ``close()`` or garbage
+    collection of the generator). Errors raised while producing are
+    re-raised in the consumer. ``depth <= 0`` disables the thread.
+    """
+    if depth <= 0:
+        yield from pages
+        return
+
+    buffer = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item: Tuple[Any, Optional[BaseException]]) -> bool:
+        """Block until ``item`` is buffered; False once stopped."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for page in pages:
+                if not put((page, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as error:  # handed over to the consumer
+            put((_DONE, error))
+
+    thread = threading.Thread(target=produce, name="page-prefetch",
+                              daemon=True)
+    thread.start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if page is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        stop.set()
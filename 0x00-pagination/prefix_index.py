@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Name-prefix search ranked by count.
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Sequence, Tuple
+
+# Sorts after every character, so ``prefix + _LAST`` bounds a prefix
+_LAST = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Rows ordered by name, with a max-count segment tree on top.
+
+    Names are compared case-insensitively. The distinct names are kept
+    once, sorted, with the start of each name's run of rows, so a
+    prefix maps to one contiguous range of rows by binary search. A
+    segment tree over the rows' counts finds the row with the highest
+    count in any range in O(log n); the k best rows of a range are
+    then produced in O(k log n) by repeatedly splitting the range
+    around its best row.
+    """
+
+    def __init__(self, dataset: Sequence[List[str]], name_column: int,
+                 count_column: int):
+        """Index the names and counts of ``dataset``."""
+        self.dataset = dataset
+        size = len(dataset)
+        columns = getattr(dataset, "columns", None)
+        if columns is not None:
+            # Columnar datasets hand out whole columns without rows
+            names = columns[name_column].slice(0, size)
+            counts = columns[count_column].slice(0, size)
+        else:
+            names = [row[name_column] for row in dataset]
+            counts = [row[count_column] for row in dataset]
+        folded = {name: name.casefold() for name in set(names)}
+        names = [folded[name] for name in names]
+        typecode = "I" if size < 2 ** 32 else "Q"
+        # Stable sort: rows with the same name stay in file order
+        self.ids = array(typecode, sorted(range(size),
+                                          key=names.__getitem__))
+        self.counts = array("q", (int(counts[i]) for i in self.ids))
+        self.keys = sorted(set(folded.values()))
+        self.starts = array(typecode, [0] * (len(self.keys) + 1))
+        for name in names:
+            self.starts[bisect_left(self.keys, name) + 1] += 1
+        for k in range(len(self.keys)):
+            self.starts[k + 1] += self.starts[k]
+        self._build_tree()
+
+    def range(self, prefix: str) -> Tuple[int, int]:
+        """Positions ``[lo, hi)`` of the rows whose name has ``prefix``."""
+        prefix = prefix.casefold()
+        first = bisect_left(self.keys, prefix)
+        last = bisect_left(self.keys, prefix + _LAST, first)
+        return self.starts[first], self.starts[last]
+
+    def count(self, prefix: str) -> int:
+        """Number of rows whose name starts with ``prefix``."""
+        lo, hi = self.range(prefix)
+        return hi - lo
+
+    def top(self, prefix: str, k: int) -> List[int]:
+        """Row ids of the ``k`` best rows whose name has ``prefix``.
+
+        Rows are ranked by count, highest first; ties go to the
+        alphabetically first name, then to file order.
+        """
+        lo, hi = self.range(prefix)
+        return [self.ids[pos] for pos in self._best(lo, hi, k)]
+
+    def _best(self, lo: int, hi: int, k: int) -> Iterator[int]:
+        """Positions of the ``k`` best rows in ``[lo, hi)``, best first."""
+        counts = self.counts
+        heap = []
+
+        def push(lo: int, hi: int) -> None:
+            if lo < hi:
+                pos = self._argmax(lo, hi)
+                heapq.heappush(heap, (-counts[pos], pos, lo, hi))
+
+        push(lo, hi)
+        while heap and k > 0:
+            _, pos, lo, hi = heapq.heappop(heap)
+            yield pos
+            k -= 1
+            push(lo, pos)
+            push(pos + 1, hi)
+
+    def _argmax(self, lo: int, hi: int) -> int:
+        """Position of the best row in ``[lo, hi)``."""
+        tree, counts = self.tree, self.counts
+        best = -1
+        lo += len(counts)
+        hi += len(counts)
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def _better(self, a: int, b: int) -> int:
+        """The better of positions ``a`` and ``b``; ``a`` may be -1."""
+        if a < 0:
+            return b
+        count_a, count_b = self.counts[a], self.counts[b]
+        if count_a > count_b or (count_a == count_b and a < b):
+            return a
+        return b
+
+    def _build_tree(self) -> None:
+        """Build the segment tree of best positions bottom-up in O(n)."""
+        n = len(self.counts)
+        tree = array(self.ids.typecode, bytes(2 * n * self.ids.itemsize))
+        tree[n:] = array(self.ids.typecode, range(n))
+        for node in range(n - 1, 0, -1):
+            tree[node] = self._better(tree[2 * node], tree[2 * node + 1])
+        self.tree = tree
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped row-offset index over a CSV file.
+"""
+import copy
+import csv
+import io
+import mmap
+import os
+from array import array
+from collections.abc import Sequence
+from typing import Iterator, List, Optional, Union
+
+
+class RowIndex(Sequence):
+    """Lazy, read-only sequence over the data rows of a CSV file.
+
+    The file is memory-mapped and only an array of row start offsets
+    is kept in memory. Rows are parsed on access, so serving a page
+    costs the rows of that page, not the whole file.
+
+    The offset index is saved next to the CSV (``<file>.idx``) and is
+    reused by later processes as long as the file size and mtime match.
+    """
+    INDEX_SUFFIX = ".idx"
+    MAGIC = b"ROWIDX01"
+    ENCODING = "utf-8"
+    ITER_CHUNK = 1024
+
+    def __init__(self, path: str, skip_header: bool = True,
+                 persist: bool = True):
+        """Map ``path`` and build or load its row-offset index."""
+        self.path = path
+        self.skip_header = skip_header
+        stat = os.stat(path)
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._mm = None
+        if self._size:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = self._load_index()
+        if self._offsets is None:
+            self._offsets = self._build_index()
+            if persist:
+                self._save_index()
+
+    def __len__(self) -> int:
+        """Number of data rows."""
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: Union[int, slice]
+                    ) -> Union[List[str], List[List[str]]]:
+        """Parse a single row, or the rows of a slice."""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return self.rows(start, stop)
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("row index out of range")
+        return self.rows(i, i + 1)[0]
+
+    def __iter__(self) -> Iterator[List[str]]:
+        """Iterate over all rows, parsing them chunk by chunk."""
+        n = len(self)
+        for start in range(0, n, self.ITER_CHUNK):
+            yield from self.rows(start, min(start + self.ITER_CHUNK, n))
+
+    @property
+    def offsets(self) -> array:
+        """Byte offset of every row, plus the end of the last row."""
+        return self._offsets
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the offset index, in bytes."""
+        return self._offsets.itemsize * len(self._offsets)
+
+    def rows(self, start: int, stop: int) -> List[List[str]]:
+        """Parse the rows in ``[start, stop)`` from one contiguous read."""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        raw = self._mm[self._offsets[start]:self._offsets[stop]]
+        text = raw.decode(self.ENCODING)
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def extended(self, end: int) -> "RowIndex":
+        """A new index over this file grown to ``end`` bytes.
+
+        Only the bytes after the current end are scanned, and they
+        must hold complete rows. This index is left untouched, so
+        readers holding it keep a consistent view.
+        """
+        new = copy.copy(self)
+        new._size = end
+        new._mtime_ns = os.stat(self.path).st_mtime_ns
+        with open(self.path, "rb") as f:
+            new._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        typecode = "I" if end < 2 ** 32 else "Q"
+        new._offsets = array(typecode, self._offsets[:-1])
+        new._scan(new._offsets, self._size, False)
+        return new
+
+    def _build_index(self) -> array:
+        """Scan the file once and record where every row starts."""
+        typecode = "I" if self._size < 2 ** 32 else "Q"
+        offsets = array(typecode)
+        if self._mm is None:
+            offsets.append(0)
+            return offsets
+        self._scan(offsets, 0, self.skip_header)
+        return offsets
+
+    def _scan(self, offsets: array, pos: int, header: bool) -> None:
+        """Append the start of every row in ``[pos, size)`` to
+        ``offsets``, followed by the end offset.
+
+        Newlines inside quoted fields do not start a row: a line only
+        ends a row when the number of quotes seen so far is even.
+        """
+        mm, size = self._mm, self._size
+        quoted = mm.find(b'"', pos, size) != -1
+        in_quotes = False
+        row_start = pos
+        while pos < size:
+            end = mm.find(b"\n", pos, size)
+            end = size if end == -1 else end + 1
+            if quoted and mm[pos:end].count(b'"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                if not header:
+                    offsets.append(row_start)
+                header = False
+                row_start = end
+            pos = end
+        if in_quotes and not header:
+            offsets.append(row_start)
+        offsets.append(size)
+
+    def _index_path(self) -> str:
+        """Path of the sidecar offset index."""
+        return self.path + self.INDEX_SUFFIX
+
+    def _header(self, typecode: str, count: int) -> bytes:
+        """Header tying a saved index to this exact version of the file."""
+        return b"%s %d %d %d %s %d\n" % (
+            self.MAGIC, self._size, self._mtime_ns,
+            int(self.skip_header), typecode.encode(), count
+        )
+
+    def _load_index(self) -> Optional[array]:
+        """Load the sidecar index, or return None if it is missing/stale."""
+        try:
+            with open(self._index_path(), "rb") as f:
+                fields = f.readline().split()
+                if len(fields) != 6 or fields[0] != self.MAGIC:
+                    return None
+                typecode = fields[4].decode()
+                count = int(fields[5])
+                if self._header(typecode, count) != \
+                        b" ".join(fields) + b"\n":
+                    return None
+                offsets = array(typecode)
+                offsets.fromfile(f, count)
+                return offsets
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def _save_index(self) -> None:
+        """Write the sidecar index atomically; ignore unwritable dirs."""
+        path = self._index_path()
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with open(tmp, "wb") as f:
+                f.write(self._header(self._offsets.typecode,
+                                     len(self._offsets)))
+                self._offsets.tofile(f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes for filtered and sorted pagination.
+"""
+import copy
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import compress
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def _id_typecode(n: int) -> str:
+    """Typecode able to hold row ids below ``n``."""
+    return "I" if n < 2 ** 32 else "Q"
+
+
+def _contains(ids: Sequence[int], i: int) -> bool:
+    """True if the sorted sequence ``ids`` contains ``i``."""
+    j = bisect_left(ids, i)
+    return j < len(ids) and ids[j] == i
+
+
+class Positions(dict):
+    """Inverse permutations of an index by column, built on first use."""
+
+    def __init__(self, index: "SecondaryIndex"):
+        super().__init__()
+        self.index = index
+
+    def __missing__(self, name: str) -> array:
+        position = self[name] = self.index._positions(name)
+        return position
+
+
+class SecondaryIndex:
+    """Posting lists and presorted permutations over a dataset.
+
+    For every filterable column, a posting list (sorted row ids) per
+    distinct value. For every sortable column, the permutation of row
+    ids in ascending order of that column (numerically when all values
+    are integers, ties by row id) and, once a query needs it, the
+    inverse permutation.
+
+    ``query`` combines them and caches recent results, so a result's
+    size, and with it ``total_pages``, is known without scanning rows.
+    """
+    QUERY_CACHE_SIZE = 64
+
+    def __init__(self, dataset: Sequence[List[str]], columns: Sequence[str],
+                 filterable: Sequence[str] = (),
+                 sortable: Sequence[str] = ()):
+        """Build the indexes in one pass over ``dataset``."""
+        self.dataset = dataset
+        self.columns = tuple(columns)
+        self.filterable = tuple(filterable)
+        self.sortable = tuple(sortable)
+        self.size = len(dataset)
+        self.postings = {}
+        self.permutations = {}
+        self.positions = Positions(self)
+        # Column -> (inverse permutation of an earlier index, rank up to
+        # which it is still right), to build ``positions`` from
+        self._stale = {}
+        self.numeric = {}
+        self._queries = OrderedDict()
+        wanted = {name: self.columns.index(name)
+                  for name in set(filterable) | set(sortable)}
+        columns = getattr(dataset, "columns", None)
+        if columns is not None:
+            # Columnar datasets hand out whole columns without rows
+            values = {name: columns[j].slice(0, self.size)
+                      for name, j in wanted.items()}
+        else:
+            values = {name: [] for name in wanted}
+            for row in dataset:
+                for name, j in wanted.items():
+                    values[name].append(row[j])
+        typecode = _id_typecode(self.size)
+        for name in filterable:
+            postings = {}
+            for i, value in enumerate(values[name]):
+                postings.setdefault(value, []).append(i)
+            self.postings[name] = {value: array(typecode, ids)
+                                   for value, ids in postings.items()}
+        for name in sortable:
+            column = values[name]
+            try:
+                column = [int(value) for value in column]
+                self.numeric[name] = True
+            except ValueError:
+                self.numeric[name] = False
+            perm = array(typecode, sorted(range(self.size),
+                                          key=column.__getitem__))
+            self.permutations[name] = perm
+
+    def extended(self, dataset: Sequence[List[str]]) -> "SecondaryIndex":
+        """Index ``dataset``: this index's rows with more appended.
+
+        Only the appended rows are read. Their ids are added to the
+        posting lists (unchanged lists are shared), and merged into
+        each permutation at positions found by binary search. Inverse
+        permutations are left for first use, when only the ranks after
+        the first insertion are recomputed. This index is left
+        untouched.
+        """
+        start, size = self.size, len(dataset)
+        tail = dataset[start:size]
+        sort_keys = {}
+        for name in self.sortable:
+            j = self.columns.index(name)
+            try:
+                sort_keys[name] = [(int(row[j]) if self.numeric[name]
+                                    else row[j]) for row in tail]
+            except ValueError:
+                # A numeric column got a non-integer value
+                return SecondaryIndex(dataset, self.columns,
+                                      self.filterable, self.sortable)
+        new = copy.copy(self)
+        new.dataset, new.size = dataset, size
+        new._queries = OrderedDict()
+        typecode = _id_typecode(size)
+        new.postings = {}
+        for name, old in self.postings.items():
+            j = self.columns.index(name)
+            postings = dict(old)
+            for i, row in enumerate(tail, start):
+                ids = postings.get(row[j])
+                if ids is None or ids is old.get(row[j]) \
+                        or ids.typecode != typecode:
+                    ids = postings[row[j]] = array(typecode, ids or ())
+                ids.append(i)
+            new.postings[name] = postings
+        new.permutations, new.positions = {}, Positions(new)
+        new._stale = {}
+        for name, perm in self.permutations.items():
+            key = self._sort_key(name)
+            merged = array(typecode)
+            done, first = 0, len(perm)
+            for k, i in sorted(zip(sort_keys[name], range(start, size))):
+                # Equal keys order by row id, and new ids are the largest
+                lo, hi = done, len(perm)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if k < key(perm[mid]):
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                merged.extend(perm[done:lo])
+                merged.append(i)
+                first = min(first, lo)
+                done = lo
+            merged.extend(perm[done:])
+            new.permutations[name] = merged
+            if name in self.positions:
+                new._stale[name] = (self.positions[name], first)
+            elif name in self._stale:
+                position, ranks = self._stale[name]
+                new._stale[name] = (position, min(ranks, first))
+        return new
+
+    def _sort_key(self, name: str) -> Callable[[int], Any]:
+        """Sort key of a row id for column ``name``."""
+        j = self.columns.index(name)
+        dataset = self.dataset
+        if self.numeric[name]:
+            return lambda i: int(dataset[i][j])
+        return lambda i: dataset[i][j]
+
+    def _positions(self, name: str) -> array:
+        """Inverse permutation of column ``name``, reusing the ranks an
+        earlier index got right."""
+        perm = self.permutations[name]
+        position, first = self._stale.pop(name, (None, 0))
+        if position is None:
+            return self._inverse(perm)
+        if position.typecode == perm.typecode:
+            position = position[:]
+        else:
+            position = array(perm.typecode, position)
+        position.frombytes(bytes(perm.itemsize * (len(perm) -
+                                                  len(position))))
+        for rank, i in enumerate(perm[first:], first):
+            position[i] = rank
+        return position
+
+    @staticmethod
+    def _inverse(perm: array) -> array:
+        """Inverse permutation: the rank of every row id."""
+        position = array(perm.typecode, bytes(perm.itemsize * len(perm)))
+        for rank, i in enumerate(perm):
+            position[i] = rank
+        return position
+
+    def cardinality(self, column: str, value: Any) -> int:
+        """Number of rows whose ``column`` equals ``value``."""
+        return len(self.postings[column].get(str(value), ()))
+
+    def query(self, filters: Optional[Dict[str, Any]] = None,
+              sort: Optional[str] = None) -> Sequence[int]:
+        """Row ids matching ``filters`` (column -> value), in order.
+
+        ``sort`` names a sortable column, prefixed with ``-`` for
+        descending order (the exact reverse of ascending). Without it,
+        rows keep file order.
+        """
+        key = self.query_key(filters, sort)
+        ids = self._queries.get(key)
+        if ids is None:
+            ids = self._run(*key)
+            self._queries[key] = ids
+            if len(self._queries) > self.QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+        else:
+            self._queries.move_to_end(key)
+        return ids
+
+    def query_key(self, filters: Optional[Dict[str, Any]],
+                  sort: Optional[str]) -> Tuple:
+        """Canonical, hashable form of a query."""
+        filters = tuple(sorted((column, str(value))
+                               for column, value in (filters or {}).items()))
+        for column, _ in filters:
+            assert column in self.postings, \
+                "cannot filter on {!r}".format(column)
+        if sort is not None:
+            assert sort.lstrip("-") in self.permutations, \
+                "cannot sort on {!r}".format(sort)
+        return filters, sort
+
+    def _run(self, filters: Tuple, sort: Optional[str]) -> Sequence[int]:
+        """Evaluate a canonical query."""
+        typecode = _id_typecode(self.size)
+        if filters:
+            postings = sorted((self.postings[column].get(value, array(
+                typecode)) for column, value in filters), key=len)
+            smallest, others = postings[0], postings[1:]
+            ids = array(typecode, (i for i in smallest
+                                   if all(_contains(p, i) for p in others)))
+        else:
+            ids = None
+        if sort is None:
+            return range(self.size) if ids is None else ids
+        column = sort.lstrip("-")
+        perm = self.permutations[column]
+        if ids is None:
+            ordered = perm
+        elif len(ids) * max(len(ids).bit_length(), 1) < self.size:
+            ordered = array(typecode, sorted(
+                ids, key=self.positions[column].__getitem__))
+        else:
+            mask = bytearray(self.size)
+            for i in ids:
+                mask[i] = 1
+            ordered = array(typecode,
+                            compress(perm, map(mask.__getitem__, perm)))
+        if sort.startswith("-"):
+            ordered = array(typecode, reversed(ordered))
+        return ordered
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+One logical dataset over several CSV files.
+"""
+import threading
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Callable, List, Union
+
+from row_index import RowIndex
+
+
+class ShardedDataset(Sequence):
+    """The data rows of several CSV files (shards), end to end.
+
+    Only the rows of each shard are counted up front, using the offset
+    index of ``row_index`` (a byte scan, saved next to the file, not a
+    parse). A prefix array of those counts maps a global row number to
+    its shard by binary search. A shard is loaded with ``load`` the
+    first time one of its rows is read, so a page only parses the
+    shards it spans.
+    """
+
+    def __init__(self, paths: List[str],
+                 load: Callable[[str], Sequence]):
+        """Count the rows of every file of ``paths``."""
+        self.paths = list(paths)
+        self._load = load
+        self._shards = [None] * len(self.paths)
+        self._lock = threading.Lock()
+        self.prefix = [0]
+        for path in self.paths:
+            index = RowIndex(path)
+            self.prefix.append(self.prefix[-1] + len(index))
+            index.close()
+
+    def __len__(self) -> int:
+        return self.prefix[-1]
+
+    def __getitem__(self, i: Union[int, slice]
+                    ) -> Union[List[str], List[List[str]]]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return self.rows(start, stop)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        k = self.locate(i)
+        return self.shard(k)[i - self.prefix[k]]
+
+    def locate(self, i: int) -> int:
+        """Number of the shard holding global row ``i``."""
+        return bisect_right(self.prefix, i) - 1
+
+    def rows(self, start: int, stop: int) -> List[List[str]]:
+        """The rows in ``[start, stop)``, read shard by shard."""
+        stop = min(stop, len(self))
+        rows = []
+        k = self.locate(start) if start < stop else len(self.paths)
+        while start < stop:
+            end = min(stop, self.prefix[k + 1])
+            if end > start:
+                base = self.prefix[k]
+                rows.extend(self.shard(k)[start - base:end - base])
+            start = end
+            k += 1
+        return rows
+
+    def shard(self, k: int) -> Sequence:
+        """Rows of shard ``k``, loading it on first use."""
+        shard = self._shards[k]
+        if shard is None:
+            with self._lock:
+                shard = self._shards[k]
+                if shard is None:
+                    shard = self._load(self.paths[k])
+                    expected = self.prefix[k + 1] - self.prefix[k]
+                    if len(shard) != expected:
+                        raise ValueError("{} has {} rows, expected {}".format(
+                            self.paths[k], len(shard), expected))
+                    self._shards[k] = shard
+        return shard
+
+    @property
+    def loaded(self) -> List[bool]:
+        """Whether each shard has been loaded."""
+        return [shard is not None for shard in self._shards]
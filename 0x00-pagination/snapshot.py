@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Persistent binary snapshot of a CSV dataset.
+
+A snapshot stores a ``ColumnarDataset``: integer columns as raw arrays
+and text columns as codes into a string table. It also keeps the byte
+offset of every row in the source file. The header records the format
+version, the size and mtime of the CSV it was built from and a CRC32
+of the whole payload, so a snapshot is only used while it matches the
+file exactly.
+
+Loading maps the file and exposes the arrays as ``memoryview`` casts,
+so opening a snapshot does not parse or copy the data.
+"""
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Union
+
+from columnar import (Buffer, CategoricalColumn, ColumnarDataset,
+                      IntColumn, StringColumn, encode_pool)
+
+
+SNAPSHOT_SUFFIX = ".snap"
+MAGIC = b"PGSNAP\x00\x00"
+VERSION = 1
+# magic, version, csv size, csv mtime_ns, payload length, crc32
+HEADER = struct.Struct("<8sHQqQI")
+ALIGN = 8
+
+
+def snapshot_path(csv_path: str) -> str:
+    """Path of the snapshot belonging to ``csv_path``."""
+    return csv_path + SNAPSHOT_SUFFIX
+
+
+def build_snapshot(csv_path: str,
+                   path: Optional[str] = None) -> ColumnarDataset:
+    """Parse ``csv_path`` and write its snapshot atomically.
+
+    Raises:
+        ValueError: If the rows do not all have as many fields as the
+            header, since such a file has no columnar form.
+    """
+    path = path or snapshot_path(csv_path)
+    stat = os.stat(csv_path)
+    dataset = ColumnarDataset.from_csv(csv_path)
+
+    sections = []
+    schema = {"header": dataset.header, "nrows": len(dataset),
+              "columns": []}
+
+    def add(data: Union[bytes, Buffer], typecode: str = "B") -> List:
+        sections.append(bytes(data))
+        return [len(sections) - 1, typecode]
+
+    for column in dataset.columns:
+        spec = {"name": column.name, "kind": column.kind}
+        if column.kind == "int":
+            spec["values"] = add(column.values, column.values.typecode)
+        else:
+            if column.kind == "cat":
+                pool, pool_offsets = encode_pool(column.categories)
+            else:
+                pool, pool_offsets = column.pool, column.pool_offsets
+            spec["codes"] = add(column.codes, column.codes.typecode)
+            spec["pool"] = add(pool)
+            spec["pool_offsets"] = add(pool_offsets, pool_offsets.typecode)
+        schema["columns"].append(spec)
+    schema["row_offsets"] = add(dataset.row_offsets,
+                                dataset.row_offsets.typecode)
+
+    payload = _pack_payload(schema, sections)
+    crc = _checksum(stat.st_size, stat.st_mtime_ns, payload)
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, stat.st_size,
+                                stat.st_mtime_ns, len(payload), crc))
+            f.write(payload)
+        os.replace(tmp, path)
+    except OSError:
+        # Read-only deployments still get the columnar form in memory.
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return _unpack_payload(memoryview(payload), None)
+    return open_snapshot(csv_path, path) or \
+        _unpack_payload(memoryview(payload), None)
+
+
+def open_snapshot(csv_path: str,
+                  path: Optional[str] = None) -> Optional[ColumnarDataset]:
+    """Open the snapshot of ``csv_path`` if it is valid and fresh.
+
+    Returns None when the snapshot is missing, was written by another
+    format version, belongs to another size/mtime of the CSV, or fails
+    its checksum.
+    """
+    path = path or snapshot_path(csv_path)
+    try:
+        stat = os.stat(csv_path)
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < HEADER.size:
+        mm.close()
+        return None
+    magic, version, size, mtime_ns, length, crc = HEADER.unpack_from(mm)
+    payload = memoryview(mm)[HEADER.size:]
+    if (magic != MAGIC or version != VERSION or size != stat.st_size
+            or mtime_ns != stat.st_mtime_ns or length != len(payload)
+            or crc != _checksum(size, mtime_ns, payload)):
+        payload.release()
+        mm.close()
+        return None
+    return _unpack_payload(payload, mm)
+
+
+def load_snapshot(csv_path: str) -> ColumnarDataset:
+    """Open the snapshot of ``csv_path``, rebuilding it if it is stale."""
+    snapshot = open_snapshot(csv_path)
+    if snapshot is None:
+        snapshot = build_snapshot(csv_path)
+    return snapshot
+
+
+def _checksum(size: int, mtime_ns: int,
+              payload: Union[bytes, memoryview]) -> int:
+    """CRC32 of the payload, tied to the source file's size and mtime."""
+    return zlib.crc32(payload, zlib.crc32(struct.pack("<Qq", size,
+                                                      mtime_ns)))
+
+
+def _pack_payload(schema: Dict[str, Any], sections: List[bytes]) -> bytes:
+    """Lay out the schema and the 8-byte aligned sections."""
+    layout = []
+    offset = 0
+    for data in sections:
+        layout.append((offset, len(data)))
+        offset += len(data) + (-len(data)) % ALIGN
+    schema = dict(schema, sections=layout)
+    meta = json.dumps(schema).encode("utf-8")
+    start = 4 + len(meta)
+    start += (-(HEADER.size + start)) % ALIGN
+    out = bytearray(struct.pack("<I", len(meta)) + meta)
+    out += bytes(start - len(out))
+    for data in sections:
+        out += data
+        out += bytes((-len(data)) % ALIGN)
+    return bytes(out)
+
+
+def _unpack_payload(payload: memoryview,
+                    mm: Optional[mmap.mmap]) -> ColumnarDataset:
+    """Build a dataset whose columns are views into the payload."""
+    meta_len, = struct.unpack_from("<I", payload)
+    schema = json.loads(bytes(payload[4:4 + meta_len]).decode("utf-8"))
+    start = 4 + meta_len
+    start += (-(HEADER.size + start)) % ALIGN
+    layout = schema["sections"]
+
+    def view(ref: List) -> memoryview:
+        index, typecode = ref
+        offset, length = layout[index]
+        data = payload[start + offset:start + offset + length]
+        return data if typecode == "B" else data.cast(typecode)
+
+    columns = []
+    for spec in schema["columns"]:
+        if spec["kind"] == "int":
+            columns.append(IntColumn(spec["name"], view(spec["values"])))
+            continue
+        column = StringColumn(spec["name"], view(spec["codes"]),
+                              view(spec["pool"]), view(spec["pool_offsets"]))
+        if spec["kind"] == "cat":
+            column = CategoricalColumn(
+                column.name, column.codes,
+                [column.string(code) for code in range(column.cardinality)])
+        columns.append(column)
+    return ColumnarDataset(schema["header"], columns,
+                           schema["nrows"], view(schema["row_offsets"]),
+                           source=mm)
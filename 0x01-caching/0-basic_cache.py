@@ -11,15 +11,28 @@ class BasicCache(BaseCaching):
         This cache has no limit on the number of items it can store.
     """
 
-    def put(self, key, item):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """ Initialize the cache; it takes a ``ttl`` but no budget, so
+            ``max_items`` and ``max_bytes`` must be left to None
+        """
+        assert max_items is None and max_bytes is None, \
+            "BasicCache has no limit: use another policy for a budget"
+        super().__init__(None, None, sizer, ttl)
+
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache.
             if key or item is None, this method does nothing.
+            ``ttl`` overrides the default ttl of the cache for this item.
         """
         if key is not None and item is not None:
-            self.cache_data[key] = item
+            self._tick()
+            self._store(key, item, 0, ttl)
 
     def get(self, key):
         """ Get an item by key.
             If the key doesn't exist or is None, Return None
         """
+        if self._expired(key):
+            return None
         return self.cache_data.get(key)
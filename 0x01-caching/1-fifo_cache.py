@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """ FIFOCache module
 """
-
+from collections import OrderedDict
 
 from base_caching import BaseCaching
 
@@ -11,29 +11,46 @@ class FIFOCache(BaseCaching):
         It used a First-In-First-Out cashing policy.
     """
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
         """ Initialize the class by calling the parent class initializer.
+            The arguments are those of ``BaseCaching``.
         """
-        super().__init__()
-        self.order = []
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        # Keys in insertion order; updating a key keeps its place
+        self.order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache.
         If key or item is None, this method does nothing.
-        If the cache exceeds the limit defined by MAX_ITEMS,
-        the first item added to the cache is discarded.
+        If the cache exceeds the limit defined by MAX_ITEMS (or
+        max_bytes), the first items added to the cache are discarded.
+        ``ttl`` overrides the default ttl of the cache for this item.
         """
         if key is not None and item is not None:
-            if key not in self.cache_data:
-                if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                    first_key = self.order.pop(0)
-                    del self.cache_data[first_key]
-                    print(f"DISCARD: {first_key}")
-            self.cache_data[key] = item
-            self.order.append(key)
+            self._tick()
+            size = self._size(key, item)
+            if size is None:
+                return
+            while self._overflows(key, size):
+                keys = iter(self.order)
+                first_key = next(keys)
+                if first_key == key:
+                    first_key = next(keys)
+                del self.order[first_key]
+                self._evict(first_key)
+            self._store(key, item, size, ttl)
+            self.order[key] = None
 
     def get(self, key):
         """ Get an item by key.
             If the key does not exist or if the key is None, return None
         """
+        if self._expired(key):
+            return None
         return self.cache_data.get(key)
+
+    def _forget(self, key):
+        """ Remove a discarded key from the insertion order.
+        """
+        del self.order[key]
@@ -3,6 +3,8 @@
 LFUCache module
 """
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
@@ -13,16 +15,34 @@ class LFUCache(BaseCaching):
     the least frequently used item when the cache exceeds its size limit.
     If there is a tie, it uses the LRU algorithm to discard the least
     recently used item.
+
+    Keys are kept in one bucket per frequency, each ordered from least
+    to most recently used, and the lowest non-empty frequency is
+    tracked, so every operation is O(1).
+
+    With ``aging``, the cache uses dynamic aging (LFU-DA): the cache
+    age becomes the frequency of each evicted key, and new keys start
+    just above it instead of at 1. Keys that were hot long ago but are
+    no longer used are then eventually evicted, instead of pinning the
+    cache forever.
     """
 
-    def __init__(self):
-        """Initialize the LFUCache class."""
-        super().__init__()
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None, aging=False):
+        """Initialize the LFUCache class.
+
+        Args:
+            max_items, max_bytes, sizer, ttl: As for ``BaseCaching``.
+            aging (bool): Use dynamic aging (see the class docstring).
+        """
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        self.aging = aging
+        self.age = 0
         self.freq = {}
-        self.lru = {}
-        self.usage_count = 0
+        self.buckets = {}  # frequency -> OrderedDict of keys, LRU first
+        self.min_freq = 0
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache. If the cache exceeds its limit,
         discard the least frequently used item.
@@ -31,28 +51,40 @@ class LFUCache(BaseCaching):
         Args:
             key (str): The key for the cache.
             item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
         """
         if key is None or item is None:
             return
 
-        if key in self.cache_data:
-            self.cache_data[key] = item
-            self.freq[key] += 1
-        else:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                lfu_key = min(
-                    self.freq, key=lambda k: (self.freq[k], self.lru[k])
-                )
-                del self.cache_data[lfu_key]
-                del self.freq[lfu_key]
-                del self.lru[lfu_key]
-                print(f"DISCARD: {lfu_key}")
-
-            self.cache_data[key] = item
-            self.freq[key] = 1
-
-        self.usage_count += 1
-        self.lru[key] = self.usage_count
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        update = key in self.cache_data
+        if update:
+            # Out of the buckets while others are evicted for its bytes
+            count = self._unlink(key) + 1
+        emptied = False
+        while self._overflows(key, size):
+            if self.min_freq not in self.buckets:
+                self.min_freq = min(self.buckets)
+            bucket = self.buckets[self.min_freq]
+            lfu_key = bucket.popitem(last=False)[0]
+            if not bucket:
+                del self.buckets[self.min_freq]
+                emptied = True
+            if self.aging:
+                self.age = self.freq[lfu_key]
+            del self.freq[lfu_key]
+            self._evict(lfu_key)
+        if emptied and update and self.buckets:
+            # Other keys may now be below the updated key
+            self.min_freq = min(self.buckets)
+        if not update:
+            count = self.age + 1
+
+        self._store(key, item, size, ttl)
+        self._link(key, count)
 
     def get(self, key):
         """
@@ -66,11 +98,40 @@ class LFUCache(BaseCaching):
         str: The value associated with the key or None
         if the key doesn't exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
             return None
 
-        self.freq[key] += 1
-        self.usage_count += 1
-        self.lru[key] = self.usage_count
+        self._touch(key)
 
         return self.cache_data[key]
+
+    def _touch(self, key):
+        """Move a key to the next frequency, as most recently used."""
+        self._link(key, self._unlink(key) + 1)
+
+    def _link(self, key, count):
+        """Add a key to the bucket of ``count``, as most recently used."""
+        self.freq[key] = count
+        self.buckets.setdefault(count, OrderedDict())[key] = None
+        # If the lowest bucket was emptied, every other key is at
+        # ``count`` or above: a touched key was alone in it, and new
+        # keys start above the frequency of any evicted key
+        if count < self.min_freq or self.min_freq not in self.buckets:
+            self.min_freq = count
+
+    def _unlink(self, key):
+        """Remove a key from its frequency bucket; return its frequency."""
+        count = self.freq[key]
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+        return count
+
+    def _forget(self, key):
+        """Drop the frequency and recency of a discarded key."""
+        count = self._unlink(key)
+        del self.freq[key]
+        if count == self.min_freq and count not in self.buckets:
+            self.min_freq = min(self.buckets, default=0)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+TinyLFUCache module
+"""
+
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+# Halves every 4-bit counter of a sketch row in one bytes.translate
+HALVE = bytes(count >> 1 for count in range(256))
+SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+         0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+MASK64 = (1 << 64) - 1
+
+
+class FrequencySketch():
+    """ FrequencySketch estimates how often keys were seen recently.
+
+        A count-min sketch of four rows of 4-bit counters (one byte
+        each here), about four times as many counters as the cache has
+        items. Each key maps to one counter per row and its estimate is
+        the smallest of them. After ``10 * capacity`` increments every
+        counter is halved, so old popularity fades.
+    """
+
+    def __init__(self, capacity):
+        """ Initialize a sketch sized for ``capacity`` items
+        """
+        self.width = 1 << max(4, (max(capacity, 1) - 1).bit_length())
+        self.rows = [bytearray(self.width) for _ in SEEDS]
+        self.sample = 10 * max(capacity, 1)
+        self.additions = 0
+
+    def frequency(self, key):
+        """ Estimated recent count of ``key``, at most 15
+        """
+        return min(row[index] for row, index in
+                   zip(self.rows, self._indexes(key)))
+
+    def increment(self, key):
+        """ Count one more occurrence of ``key``
+        """
+        counters = list(zip(self.rows, self._indexes(key)))
+        lowest = min(row[index] for row, index in counters)
+        if lowest >= 15:
+            return
+        # Conservative update: only the counters at the estimate grow
+        for row, index in counters:
+            if row[index] == lowest:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample:
+            self.rows = [row.translate(HALVE) for row in self.rows]
+            self.additions //= 2
+
+    def _indexes(self, key):
+        """ The counter of ``key`` in each row
+        """
+        h = hash(key) & MASK64
+        shift = 64 - self.width.bit_length() + 1
+        return [((h ^ seed) * 0xFF51AFD7ED558CCD & MASK64) >> shift
+                for seed in SEEDS]
+
+
+class TinyLFUCache(BaseCaching):
+    """
+    TinyLFUCache class implements the W-TinyLFU caching policy.
+
+    New items enter a small LRU window (1% of the items). The rest of
+    the cache is a segmented LRU: items evicted from the window land in
+    a probation segment, and a hit there promotes them to the protected
+    segment (80% of the main area). When the cache is full, the
+    window's least recently used item (the candidate) competes with
+    the probation segment's (the victim): the candidate is only
+    admitted if a frequency sketch has seen it more often, so one-off
+    scans pass through the window without flushing popular items.
+
+    Metadata stays bounded: three ordered dicts of cached keys and a
+    sketch of about four bytes per item.
+    """
+
+    WINDOW = 0.01
+    PROTECTED = 0.8
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the TinyLFUCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        self.window_max = max(1, int(self.MAX_ITEMS * self.WINDOW))
+        main = max(self.MAX_ITEMS - self.window_max, 1)
+        self.protected_max = max(1, int(main * self.PROTECTED))
+        # Each segment orders keys from least to most recently used
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = FrequencySketch(self.MAX_ITEMS)
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item in the cache. If the cache is full, the window's
+        least recently used item is admitted to the main area only if
+        it is used more often than the item it would replace.
+
+        Args:
+            key (str): The key for the cache.
+            item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
+        """
+        if key is None or item is None:
+            return
+
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        if key in self.cache_data:
+            self._hit(key)
+        else:
+            self.sketch.increment(key)
+        segment = self._segment(key)
+        if segment is not None:
+            # Kept out of the contest for room while it is resized
+            del segment[key]
+        while self._overflows(key, size):
+            self._evict_one()
+
+        self._store(key, item, size, ttl)
+        (segment if segment is not None else self.window)[key] = None
+        self._balance()
+
+    def get(self, key):
+        """
+        Get an item by key and record the access, hit or miss.
+
+        Args:
+            key (str): The key to retrieve the value.
+
+        Returns:
+            str: The value associated with the key
+            or None if the key doesn't exist.
+        """
+        if key is None:
+            return None
+        self.sketch.increment(key)
+        if key not in self.cache_data or self._expired(key):
+            return None
+
+        self._hit(key)
+        return self.cache_data[key]
+
+    def _hit(self, key):
+        """Move a cached key up after an access."""
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            self._balance()
+        else:
+            self.protected.move_to_end(key)
+
+    def _balance(self):
+        """Move overflow from the window and the protected segment
+        into probation."""
+        while len(self.window) > self.window_max:
+            self.probation[self.window.popitem(last=False)[0]] = None
+        while len(self.protected) > self.protected_max:
+            self.probation[self.protected.popitem(last=False)[0]] = None
+
+    def _evict_one(self):
+        """Evict the loser of the window candidate and the main
+        area's victim."""
+        candidate = next(iter(self.window), None) \
+            if len(self.window) >= self.window_max else None
+        main = self.probation or self.protected
+        victim = next(iter(main), None)
+        if candidate is not None and victim is not None:
+            if self.sketch.frequency(candidate) > \
+                    self.sketch.frequency(victim):
+                del main[victim]
+                del self.window[candidate]
+                self.probation[candidate] = None
+                self._evict(victim)
+            else:
+                del self.window[candidate]
+                self._evict(candidate)
+        elif victim is not None:
+            del main[victim]
+            self._evict(victim)
+        else:
+            self._evict(self.window.popitem(last=False)[0])
+
+    def _segment(self, key):
+        """The segment holding ``key``, or None."""
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                return segment
+        return None
+
+    def _forget(self, key):
+        """Remove a discarded key from its segment."""
+        del self._segment(key)[key]
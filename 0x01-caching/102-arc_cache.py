@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ARCCache module
+"""
+
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """
+    ARCCache class implements the Adaptive Replacement Cache (ARC).
+
+    Cached keys are split between ``t1``, keys used once recently, and
+    ``t2``, keys used at least twice, each in LRU order. Evicted keys
+    are remembered, without their items, in the ghost lists ``b1`` and
+    ``b2``. Putting a key found in ``b1`` means recency was evicted too
+    early and grows the target size ``p`` of ``t1``; one found in
+    ``b2`` shrinks it. Eviction takes the least recently used key of
+    ``t1`` while it is above its target, else of ``t2``. A scan only
+    ever fills ``t1``, so keys used twice survive it.
+
+    Metadata stays bounded: the ghost lists hold at most ``MAX_ITEMS``
+    keys together with ``t1``, and ``2 * MAX_ITEMS`` keys in all.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the ARCCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        self.p = 0
+        # Each list orders keys from least to most recently used
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item in the cache. If the cache is full, discard the
+        least recently used item of the list chosen by the adaptive
+        target.
+
+        Args:
+            key (str): The key for the cache.
+            item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
+        """
+        if key is None or item is None:
+            return
+
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        capacity = self.MAX_ITEMS
+        in_b2 = False
+        if key in self.cache_data:
+            # Out of the lists while others are evicted for its bytes
+            self.t1.pop(key, None)
+            self.t2.pop(key, None)
+            frequent = True
+        elif key in self.b1:
+            self.p = min(self.p + max(len(self.b2) // len(self.b1), 1),
+                         capacity)
+            del self.b1[key]
+            frequent = True
+        elif key in self.b2:
+            self.p = max(self.p - max(len(self.b1) // len(self.b2), 1), 0)
+            del self.b2[key]
+            in_b2 = frequent = True
+        else:
+            frequent = False
+            if len(self.t1) + len(self.b1) >= capacity:
+                if len(self.t1) < capacity:
+                    self.b1.popitem(last=False)
+                elif self._overflows(key, size):
+                    # t1 is the whole cache: evict without a ghost
+                    self._evict(self.t1.popitem(last=False)[0])
+            elif self.b2 and len(self.t1) + len(self.t2) + len(self.b1) + \
+                    len(self.b2) >= 2 * capacity:
+                self.b2.popitem(last=False)
+        while self._overflows(key, size):
+            self._replace(in_b2)
+
+        self._store(key, item, size, ttl)
+        (self.t2 if frequent else self.t1)[key] = None
+        self._trim()
+
+    def get(self, key):
+        """
+        Get an item by key. A hit moves it to the most recently used
+        end of ``t2``.
+
+        Args:
+            key (str): The key to retrieve the value.
+
+        Returns:
+            str: The value associated with the key
+            or None if the key doesn't exist.
+        """
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
+            return None
+
+        if self.t1.pop(key, 0) is None:
+            self.t2[key] = None
+        else:
+            self.t2.move_to_end(key)
+        return self.cache_data[key]
+
+    def _replace(self, in_b2):
+        """Evict the least recently used key of t1 or t2 into its
+        ghost list."""
+        if self.t1 and (len(self.t1) > self.p or not self.t2 or
+                        (in_b2 and len(self.t1) == self.p)):
+            lru_key = self.t1.popitem(last=False)[0]
+            self.b1[lru_key] = None
+        else:
+            lru_key = self.t2.popitem(last=False)[0]
+            self.b2[lru_key] = None
+        self._evict(lru_key)
+
+    def _trim(self):
+        """Keep the ghost lists within their bounds, also when a byte
+        budget evicted several keys for one put."""
+        capacity = self.MAX_ITEMS
+        while self.b1 and len(self.t1) + len(self.b1) > capacity:
+            self.b1.popitem(last=False)
+        while self.b2 and len(self.t1) + len(self.t2) + len(self.b1) + \
+                len(self.b2) > 2 * capacity:
+            self.b2.popitem(last=False)
+
+    def _forget(self, key):
+        """Remove a discarded key from its list, leaving no ghost."""
+        if self.t1.pop(key, 0) is not None:
+            del self.t2[key]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+ClockCache module
+"""
+
+from base_caching import BaseCaching
+
+
+class ClockCache(BaseCaching):
+    """
+    ClockCache class implements the CLOCK caching policy, an
+    approximation of LRU.
+
+    Keys sit in a ring of ``MAX_ITEMS`` slots allocated up front, each
+    with a reference bit. A hit only sets the bit, so reads never
+    reorder anything. To evict, a hand sweeps the ring: a key with its
+    bit set gets a second chance (the bit is cleared and the hand moves
+    on), and the first key found with a clear bit is discarded. Its
+    slot takes the new key.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the ClockCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        self.ring = [None] * self.MAX_ITEMS
+        self.referenced = bytearray(self.MAX_ITEMS)
+        self.slots = {}  # key -> index in the ring
+        # Empty slots, handed out from the start of the ring first
+        self.free = list(range(self.MAX_ITEMS - 1, -1, -1))
+        self.hand = 0
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item in the cache. If the cache exceeds its limit,
+        discard the first item the hand finds without its reference
+        bit.
+
+        Args:
+            key (str): The key for the cache.
+            item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
+        """
+        if key is None or item is None:
+            return
+
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        while self._overflows(key, size):
+            victim = self._sweep(key)
+            self._forget(victim)
+            self._evict(victim)
+
+        self._store(key, item, size, ttl)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.free.pop()
+            self.ring[slot] = key
+            self.slots[key] = slot
+        else:
+            self.referenced[slot] = 1
+
+    def get(self, key):
+        """
+        Get an item by key and set its reference bit.
+
+        Args:
+            key (str): The key to retrieve the value.
+
+        Returns:
+            str: The value associated with the key
+            or None if the key doesn't exist.
+        """
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
+            return None
+
+        self.referenced[self.slots[key]] = 1
+        return self.cache_data[key]
+
+    def _sweep(self, key):
+        """Advance the hand to the next key to evict, other than
+        ``key``, clearing reference bits on the way."""
+        ring, referenced = self.ring, self.referenced
+        hand = self.hand
+        while True:
+            victim = ring[hand]
+            if victim is not None and victim != key:
+                if not referenced[hand]:
+                    break
+                referenced[hand] = 0
+            hand = (hand + 1) % len(ring)
+        self.hand = (hand + 1) % len(ring)
+        return victim
+
+    def _forget(self, key):
+        """Empty the slot of an evicted or discarded key."""
+        slot = self.slots.pop(key)
+        self.ring[slot] = None
+        self.referenced[slot] = 0
+        self.free.append(slot)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+SieveCache module
+"""
+
+from base_caching import BaseCaching
+
+NIL = -1
+
+
+class SieveCache(BaseCaching):
+    """
+    SieveCache class implements the SIEVE caching policy.
+
+    Keys form a queue from oldest to newest and each has a visited bit.
+    A hit only sets the bit, so reads never reorder anything. New keys
+    join at the new end. To evict, a hand moves from the old end toward
+    the new one, clearing visited bits, and discards the first key
+    found unvisited; the hand stays there for the next eviction and
+    wraps back to the old end. Unlike CLOCK, survivors keep their
+    place instead of being treated as new, so one-off keys that are
+    never hit are evicted quickly.
+
+    The queue is a doubly linked list over ``MAX_ITEMS`` slots
+    allocated up front: plain index arrays instead of one node object
+    per key.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the SieveCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        capacity = self.MAX_ITEMS
+        self.keys = [None] * capacity
+        self.visited = bytearray(capacity)
+        self.newer = [NIL] * capacity
+        self.older = [NIL] * capacity
+        self.slots = {}  # key -> slot
+        self.free = list(range(capacity - 1, -1, -1))
+        self.oldest = self.newest = self.hand = NIL
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item in the cache. If the cache exceeds its limit,
+        discard the first unvisited item from the hand onward.
+
+        Args:
+            key (str): The key for the cache.
+            item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
+        """
+        if key is None or item is None:
+            return
+
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        while self._overflows(key, size):
+            victim = self._sweep(key)
+            self._forget(victim)
+            self._evict(victim)
+
+        self._store(key, item, size, ttl)
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.visited[slot] = 1
+            return
+        slot = self.free.pop()
+        self.keys[slot] = key
+        self.slots[key] = slot
+        self.newer[slot] = NIL
+        self.older[slot] = self.newest
+        if self.newest == NIL:
+            self.oldest = slot
+        else:
+            self.newer[self.newest] = slot
+        self.newest = slot
+
+    def get(self, key):
+        """
+        Get an item by key and mark it visited.
+
+        Args:
+            key (str): The key to retrieve the value.
+
+        Returns:
+            str: The value associated with the key
+            or None if the key doesn't exist.
+        """
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
+            return None
+
+        self.visited[self.slots[key]] = 1
+        return self.cache_data[key]
+
+    def _sweep(self, key):
+        """Move the hand to the next key to evict, other than ``key``,
+        clearing visited bits on the way."""
+        keys, visited, newer = self.keys, self.visited, self.newer
+        hand = self.oldest if self.hand == NIL else self.hand
+        while keys[hand] == key or visited[hand]:
+            visited[hand] = 0
+            hand = newer[hand]
+            if hand == NIL:
+                hand = self.oldest
+        self.hand = hand
+        return keys[hand]
+
+    def _forget(self, key):
+        """Unlink the slot of an evicted or discarded key; the hand
+        moves on to the next newer key."""
+        slot = self.slots.pop(key)
+        newer, older = self.newer[slot], self.older[slot]
+        if self.hand == slot:
+            self.hand = newer
+        if older == NIL:
+            self.oldest = newer
+        else:
+            self.newer[older] = newer
+        if newer == NIL:
+            self.newest = older
+        else:
+            self.older[newer] = older
+        self.keys[slot] = None
+        self.visited[slot] = 0
+        self.free.append(slot)
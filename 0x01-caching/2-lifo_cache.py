@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """ LIFOCache module
 """
+from collections import OrderedDict
 
 from base_caching import BaseCaching
 
@@ -10,32 +11,45 @@ class LIFOCache(BaseCaching):
         It uses a Last-In-First-Out (LIFO) caching policy.
     """
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
         """ Initialize the class by calling the parent class initializer.
+            The arguments are those of ``BaseCaching``.
         """
-        super().__init__()
-        self.last_key = None
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        # Keys in the order they were last put, so a byte budget can
+        # evict several of them in turn
+        self.order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache.
         If key or item is None, this method does nothing.
-        If the cache exceeds the limit defined by MAX_ITEMS.
-        the last item added to the cache is discarded.
+        If the cache exceeds the limit defined by MAX_ITEMS (or
+        max_bytes), the last items added to the cache are discarded.
+        ``ttl`` overrides the default ttl of the cache for this item.
         """
         if key is not None and item is not None:
-            if (
-                len(self.cache_data) >= BaseCaching.MAX_ITEMS
-                and key not in self.cache_data
-            ):
-                if self.last_key:
-                    print(f"DISCARD: {self.last_key}")
-                    del self.cache_data[self.last_key]
+            self._tick()
+            size = self._size(key, item)
+            if size is None:
+                return
+            self.order.pop(key, None)
+            while self._overflows(key, size):
+                last_key = self.order.popitem()[0]
+                self._evict(last_key)
 
-            self.cache_data[key] = item
-            self.last_key = key
+            self._store(key, item, size, ttl)
+            self.order[key] = None
 
     def get(self, key):
         """ Get an item by key.
             If the key doesn't exist or if the key is None, Return None.
         """
+        if self._expired(key):
+            return None
         return self.cache_data.get(key)
+
+    def _forget(self, key):
+        """ Remove a discarded key from the put order.
+        """
+        del self.order[key]
@@ -3,6 +3,8 @@
 LRUCache module
 """
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
@@ -13,12 +15,16 @@ class LRUCache(BaseCaching):
     the least recently used item when the cache exceeds its size limit.
     """
 
-    def __init__(self):
-        """Initialize the LRUCache class."""
-        super().__init__()
-        self.lru_order = []  # List to maintain the order of usage for LRU
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the LRUCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        # Keys from least to most recently used; an OrderedDict moves
+        # and pops keys in O(1), where a list needs an O(n) remove
+        self.lru_order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache. If the cache exceeds its limit,
         discard the least recently used item.
@@ -26,19 +32,22 @@ class LRUCache(BaseCaching):
         Args:
             key (str): The key for the cache.
             item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
         """
         if key is None or item is None:
             return
 
-        if key in self.cache_data:
-            self.lru_order.remove(key)
-        elif len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-            lru_key = self.lru_order.pop(0)
-            del self.cache_data[lru_key]
-            print(f"DISCARD: {lru_key}")
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        self.lru_order.pop(key, None)
+        while self._overflows(key, size):
+            lru_key = self.lru_order.popitem(last=False)[0]
+            self._evict(lru_key)
 
-        self.cache_data[key] = item
-        self.lru_order.append(key)
+        self._store(key, item, size, ttl)
+        self.lru_order[key] = None
 
     def get(self, key):
         """
@@ -52,10 +61,14 @@ class LRUCache(BaseCaching):
             str: The value associated with the key
             or None if the key doesn't exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
             return None
 
-        self.lru_order.remove(key)
-        self.lru_order.append(key)
+        self.lru_order.move_to_end(key)
 
         return self.cache_data[key]
+
+    def _forget(self, key):
+        """Remove a discarded key from the usage order."""
+        del self.lru_order[key]
@@ -3,6 +3,8 @@
 MRUCache module
 """
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
@@ -13,12 +15,16 @@ class MRUCache(BaseCaching):
     the most recently used item when the cache exceeds its size limit.
     """
 
-    def __init__(self):
-        """Initialize the MRUCache class."""
-        super().__init__()
-        self.mru_order = []  # List to maintain the order of usage for MRU
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
+        """Initialize the MRUCache class; the arguments are those of
+        ``BaseCaching``."""
+        super().__init__(max_items, max_bytes, sizer, ttl)
+        # Keys from least to most recently used; an OrderedDict moves
+        # and pops keys in O(1), where a list needs an O(n) remove
+        self.mru_order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache. If the cache exceeds its limit,
         discard the most recently used item.
@@ -26,19 +32,22 @@ class MRUCache(BaseCaching):
         Args:
             key (str): The key for the cache.
             item (str): The value for the cache.
+            ttl (float): Seconds to keep it; defaults to the cache's ttl.
         """
         if key is None or item is None:
             return
 
-        if key in self.cache_data:
-            self.mru_order.remove(key)
-        elif len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-            mru_key = self.mru_order.pop()
-            del self.cache_data[mru_key]
-            print(f"DISCARD: {mru_key}")
+        self._tick()
+        size = self._size(key, item)
+        if size is None:
+            return
+        self.mru_order.pop(key, None)
+        while self._overflows(key, size):
+            mru_key = self.mru_order.popitem()[0]
+            self._evict(mru_key)
 
-        self.cache_data[key] = item
-        self.mru_order.append(key)
+        self._store(key, item, size, ttl)
+        self.mru_order[key] = None
 
     def get(self, key):
         """
@@ -51,10 +60,14 @@ class MRUCache(BaseCaching):
         str: The value associated with
         the key or None if the key doesn't exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or \
+                self._expired(key):
             return None
 
-        self.mru_order.remove(key)
-        self.mru_order.append(key)
+        self.mru_order.move_to_end(key)
 
         return self.cache_data[key]
+
+    def _forget(self, key):
+        """Remove a discarded key from the usage order."""
+        del self.mru_order[key]
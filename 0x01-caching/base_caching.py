@@ -1,6 +1,10 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import sys
+import time
+
+from timer_wheel import TimerWheel
 
 class BaseCaching():
     """ BaseCaching defines:
@@ -8,11 +12,33 @@ class BaseCaching():
         - where your data are stored (in a directory)
     """
     MAX_ITEMS = 4
+    TTL_RESOLUTION = 0.1
+    clock = staticmethod(time.monotonic)
     
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None):
         """ Initialize
+
+        Args:
+            max_items (int): Most items held by this cache; defaults to
+                ``MAX_ITEMS``.
+            max_bytes (int): Most bytes held by this cache, as measured
+                by ``sizer``; None for no byte budget.
+            sizer (callable): Size of an item in bytes; defaults to
+                ``sys.getsizeof``, which does not follow references.
+            ttl (float): Seconds an item stays cached unless ``put``
+                gives its own ttl; None to keep items until evicted.
         """
         self.cache_data = {}
+        if max_items is not None:
+            self.MAX_ITEMS = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer or sys.getsizeof
+        self.sizes = {}
+        self.nbytes = 0
+        self.ttl = ttl
+        self.deadlines = {}
+        self.timers = None
         
     def print_cache(self):
         """ Print the cache
@@ -29,4 +55,123 @@ class BaseCaching():
     def get(self, key):
         """ Get an item by key
         """
-        raise NotImplementedError("get must be Implemented in your cache class")
\ No newline at end of file
+        raise NotImplementedError("get must be Implemented in your cache class")
+
+    def discard(self, key):
+        """ Remove an item, if cached, without printing it
+        """
+        if key in self.cache_data:
+            self._remove(key)
+            self._forget(key)
+
+    def expire(self):
+        """ Drop every item whose ttl has passed; return how many
+
+            Only the timer wheel slots that came due are visited, never
+            the whole cache.
+        """
+        if self.timers is None:
+            return 0
+        return self._expire(self.clock())
+
+    def on_discard(self, key):
+        """ Called when the policy evicts ``key``
+        """
+        print("DISCARD: {}".format(key))
+
+    def on_expire(self, key):
+        """ Called when ``key`` is dropped because its ttl passed
+        """
+
+    def _forget(self, key):
+        """ Drop the policy's bookkeeping for a removed key
+        """
+
+    def _size(self, key, item):
+        """ Bytes ``item`` counts against the budget, or None if it is
+            larger than the whole budget; it is then not cached and an
+            older value of ``key`` is dropped
+        """
+        if self.max_bytes is None:
+            return 0
+        size = self.sizer(item)
+        if size > self.max_bytes:
+            self.discard(key)
+            return None
+        return size
+
+    def _overflows(self, key, size):
+        """ Whether storing ``size`` bytes under ``key`` needs an
+            eviction first
+        """
+        if key not in self.cache_data and \
+                len(self.cache_data) >= self.MAX_ITEMS:
+            return True
+        return self.max_bytes is not None and \
+            self.nbytes - self.sizes.get(key, 0) + size > self.max_bytes
+
+    def _store(self, key, item, size, ttl=None):
+        """ Cache ``item`` under ``key``, count its ``size`` and set its
+            expiry from ``ttl`` or the default ttl
+        """
+        self.cache_data[key] = item
+        if self.max_bytes is not None:
+            self.nbytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is not None:
+            now = self.clock()
+            if self.timers is None:
+                self.timers = TimerWheel(self.TTL_RESOLUTION, now=now)
+            self.deadlines[key] = now + ttl
+            self.timers.schedule(key, now + ttl)
+        elif self.deadlines.pop(key, None) is not None:
+            self.timers.cancel(key)
+
+    def _tick(self):
+        """ Drop expired items if a timer wheel tick has passed
+        """
+        if self.timers is not None and \
+                self.clock() >= self.timers.next_time:
+            self._expire(self.clock())
+
+    def _expired(self, key):
+        """ Whether ``key`` has expired; it is then dropped. Due ticks
+            are processed on the way
+        """
+        if self.timers is None:
+            return False
+        now = self.clock()
+        if now >= self.timers.next_time and self._expire(now) and \
+                key not in self.cache_data:
+            return True
+        deadline = self.deadlines.get(key)
+        if deadline is None or now < deadline:
+            return False
+        self.discard(key)
+        self.on_expire(key)
+        return True
+
+    def _expire(self, now):
+        """ Drop the items the timer wheel fires up to ``now``
+        """
+        due = self.timers.advance(now)
+        for key in due:
+            self.discard(key)
+            self.on_expire(key)
+        return len(due)
+
+    def _evict(self, key):
+        """ Remove ``key``, chosen by the policy, and report it
+        """
+        self._remove(key)
+        self.on_discard(key)
+
+    def _remove(self, key):
+        """ Remove ``key`` and its size
+        """
+        del self.cache_data[key]
+        self.nbytes -= self.sizes.pop(key, 0)
+        if self.deadlines.pop(key, None) is not None:
+            self.timers.cancel(key)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Throughput and hit ratio of CLOCK and SIEVE against LRU.
+
+CLOCK and SIEVE only set a bit on a hit, where LRU moves the key in
+its order. For each policy this reports ``get`` hits per second on a
+full cache (the read-heavy case), then, for every trace of
+``hit_ratio_bench.py``, the operations per second of a cache-aside
+replay (each ``get``, plus a ``put`` on a miss) and its hit ratio.
+
+Usage: clock_bench.py [--capacity N] [--requests N] [--traces T,...]
+                      [--policies P,...]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache_bench import make_cache  # noqa: E402
+from hit_ratio_bench import trace  # noqa: E402
+
+
+def reads_per_second(policy: str, capacity: int, requests: int) -> float:
+    """``get`` hits per second on random keys of a full cache."""
+    cache = make_cache(policy, capacity)
+    for key in range(capacity):
+        cache.put(key, key)
+    rng = random.Random(0)
+    keys = [rng.randrange(capacity) for _ in range(requests)]
+    get = cache.get
+    start = time.perf_counter()
+    for key in keys:
+        get(key)
+    return requests / (time.perf_counter() - start)
+
+
+def replay(policy: str, capacity: int, keys: list) -> tuple:
+    """Operations per second and hit ratio of replaying ``keys``
+    cache-aside."""
+    cache = make_cache(policy, capacity)
+    get, put = cache.get, cache.put
+    hits = 0
+    start = time.perf_counter()
+    for key in keys:
+        if get(key) is None:
+            put(key, key)
+        else:
+            hits += 1
+    elapsed = time.perf_counter() - start
+    ops = 2 * len(keys) - hits
+    return ops / elapsed, hits / len(keys)
+
+
+def main() -> None:
+    """Print the throughput and hit ratio of every policy."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--capacity", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--keys", type=int, default=100000,
+                        help="distinct keys of the Zipf traces")
+    parser.add_argument("--alpha", type=float, default=0.9,
+                        help="Zipf exponent; higher is more skewed")
+    parser.add_argument("--traces", default="zipf,scan,loop,shift")
+    parser.add_argument("--policies", default="LRU,CLOCK,SIEVE")
+    args = parser.parse_args()
+    policies = args.policies.split(",")
+    print("{:<8} {:<8} {:>12} {:>10}".format(
+        "trace", "policy", "ops_per_s", "hit_ratio"))
+    for policy in policies:
+        print("{:<8} {:<8} {:>12.0f} {:>10}".format(
+            "reads", policy,
+            reads_per_second(policy, args.capacity, args.requests), "-"))
+    for shape in args.traces.split(","):
+        keys = trace(shape, args)
+        for policy in policies:
+            ops, ratio = replay(policy, args.capacity, keys)
+            print("{:<8} {:<8} {:>12.0f} {:>10.2%}".format(
+                shape, policy, ops, ratio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Hit ratio of the cache policies on standard trace shapes.
+
+Each trace is replayed cache-aside (``get``, then ``put`` on a miss)
+against every policy at the same capacity, and the share of ``get``
+hits is reported. The traces are:
+
+- zipf: keys drawn from a Zipf distribution (popularity is stable);
+- scan: the same Zipf traffic, interrupted by one-off sequential scans
+  of fresh keys, as from a batch job or a crawler;
+- loop: a cyclic pass over slightly more keys than fit (the worst case
+  of LRU, the best of MRU);
+- shift: Zipf traffic whose popular keys change halfway, so past
+  frequency stops predicting the future.
+
+Usage: hit_ratio_bench.py [--capacity N] [--requests N] [--keys N]
+                          [--alpha A] [--traces T,...] [--policies P,...]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from cache_bench import make_cache  # noqa: E402
+from cache_policies import POLICIES  # noqa: E402
+
+
+def zipf(keys: int, alpha: float, count: int, rng: random.Random,
+         offset: int = 0) -> List[int]:
+    """``count`` keys of ``range(offset, offset + keys)``, key ``offset
+    + r`` drawn with a probability proportional to ``1 / (r + 1) **
+    alpha``."""
+    weights = itertools.accumulate(1 / rank ** alpha
+                                   for rank in range(1, keys + 1))
+    population = range(offset, offset + keys)
+    return rng.choices(population, cum_weights=list(weights), k=count)
+
+
+def trace(shape: str, args: argparse.Namespace) -> List[int]:
+    """The keys of trace ``shape``, in request order."""
+    rng = random.Random(0)
+    requests, keys, alpha = args.requests, args.keys, args.alpha
+    if shape == "zipf":
+        return zipf(keys, alpha, requests, rng)
+    if shape == "scan":
+        # A scan of twice the capacity after every 4 * capacity
+        # requests, each over keys never seen before
+        burst, scan = 4 * args.capacity, 2 * args.capacity
+        hot = iter(zipf(keys, alpha, requests, rng))
+        fresh = itertools.count(keys)
+        result = []
+        while len(result) < requests:
+            result.extend(itertools.islice(hot, burst))
+            result.extend(itertools.islice(fresh, scan))
+        return result[:requests]
+    if shape == "loop":
+        cycle = args.capacity + args.capacity // 2
+        return [request % cycle for request in range(requests)]
+    if shape == "shift":
+        half = requests // 2
+        return zipf(keys, alpha, half, rng) + \
+            zipf(keys, alpha, requests - half, rng, offset=keys)
+    raise ValueError("unknown trace: {}".format(shape))
+
+
+def hit_ratio(policy: str, capacity: int, keys: List[int]) -> float:
+    """Share of ``get`` hits replaying ``keys`` cache-aside."""
+    cache = make_cache(policy, capacity)
+    get, put = cache.get, cache.put
+    hits = 0
+    for key in keys:
+        if get(key) is None:
+            put(key, key)
+        else:
+            hits += 1
+    return hits / len(keys)
+
+
+def main() -> None:
+    """Print the hit ratio of every policy on every trace."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--keys", type=int, default=100000,
+                        help="distinct keys of the Zipf traces")
+    parser.add_argument("--alpha", type=float, default=0.9,
+                        help="Zipf exponent; higher is more skewed")
+    parser.add_argument("--traces", default="zipf,scan,loop,shift")
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    args = parser.parse_args()
+    shapes = args.traces.split(",")
+    traces = [trace(shape, args) for shape in shapes]
+    print(("{:<8}" + " {:>8}" * len(shapes)).format("policy", *shapes))
+    for policy in args.policies.split(","):
+        ratios = [hit_ratio(policy, args.capacity, keys) for keys in traces]
+        print(("{:<8}" + " {:>8.2%}" * len(shapes)).format(policy, *ratios))
+
+
+if __name__ == "__main__":
+    main()
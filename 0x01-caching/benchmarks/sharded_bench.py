@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Throughput of ShardedCache as threads are added.
+
+Threads run a mix of ``get`` and ``put`` on keys drawn from a skewed
+(Zipf-like) distribution, first against one cache behind a single
+global lock (``shards=1``), then against a lock-striped cache, and
+report operations per second for each thread count.
+
+Usage: sharded_bench.py [--threads N,...] [--shards N] [--policy P]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from cache_policies import policy_class  # noqa: E402
+from sharded_cache import ShardedCache  # noqa: E402
+
+BATCH = 1 << 12
+
+
+def run(cache, threads: int, seconds: float, keys: int,
+        reads: float) -> float:
+    """Operations per second of ``threads`` threads on ``cache``."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def worker(slot: int) -> None:
+        rng = random.Random(slot)
+        batch = [(int(keys ** rng.random()), rng.random() < reads)
+                 for _ in range(BATCH)]
+        get, put = cache.get, cache.put
+        ops = 0
+        while not stop.is_set():
+            for key, read in batch:
+                if read:
+                    get(key)
+                else:
+                    put(key, key)
+            ops += BATCH
+            rng.shuffle(batch)
+        counts[slot] = ops
+
+    workers = [threading.Thread(target=worker, args=(slot,))
+               for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    """Compare a global lock with lock striping."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--policy", default="LRU")
+    parser.add_argument("--capacity", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=1000000)
+    parser.add_argument("--reads", type=float, default=0.9)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    policy = policy_class(args.policy)
+    print("{:>8} {:>14} {:>14} {:>8}".format(
+        "threads", "global_ops_s", "sharded_ops_s", "ratio"))
+    for threads in (int(t) for t in args.threads.split(",")):
+        rates = [run(ShardedCache(policy, shards, args.capacity), threads,
+                     args.seconds, args.keys, args.reads)
+                 for shards in (1, args.shards)]
+        print("{:>8} {:>14.0f} {:>14.0f} {:>8.2f}".format(
+            threads, rates[0], rates[1], rates[1] / rates[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Cache policies module
+"""
+
+# Name of every eviction policy -> (module, class) implementing it
+POLICIES = {
+    "FIFO": ("1-fifo_cache", "FIFOCache"),
+    "LIFO": ("2-lifo_cache", "LIFOCache"),
+    "LRU": ("3-lru_cache", "LRUCache"),
+    "MRU": ("4-mru_cache", "MRUCache"),
+    "LFU": ("100-lfu_cache", "LFUCache"),
+    "TinyLFU": ("101-tinylfu_cache", "TinyLFUCache"),
+    "ARC": ("102-arc_cache", "ARCCache"),
+    "CLOCK": ("103-clock_cache", "ClockCache"),
+    "SIEVE": ("104-sieve_cache", "SieveCache"),
+}
+
+
+def policy_class(name):
+    """ The BaseCaching subclass implementing policy ``name``
+    """
+    assert name in POLICIES, "policy must be one of {}".format(
+        ", ".join(POLICIES))
+    module, cls = POLICIES[name]
+    return getattr(__import__(module), cls)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Memoize module
+"""
+import asyncio
+import functools
+import threading
+
+from sharded_cache import ShardedCache
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+# Separates positional from keyword arguments in a call key
+KWARGS = object()
+
+
+def make_key(args, kwargs):
+    """ A hashable key for a call with ``args`` and ``kwargs``; keyword
+        order does not matter. Raises TypeError for unhashable
+        arguments, like functools.lru_cache
+    """
+    key = tuple(args)
+    if kwargs:
+        key += (KWARGS,) + tuple(sorted(kwargs.items()))
+    hash(key)
+    return key
+
+
+class Flight():
+    """ One load in progress, awaited by every thread that missed
+    """
+
+    def __init__(self):
+        """ Initialize an unfinished load
+        """
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class LoadingCache():
+    """ LoadingCache computes missing items once, however many threads
+        ask for them at the same time.
+
+        Items live in a ShardedCache of any BaseCaching policy. When
+        several threads miss the same key together, the first one runs
+        the loader and the others wait for its result (single flight);
+        if it raises, they all raise the same error and nothing is
+        cached. Items are stored wrapped in a 1-tuple, so a loader may
+        return None.
+    """
+
+    def __init__(self, policy=LRUCache, capacity=128, ttl=None, shards=1,
+                 max_bytes=None, sizer=None, **options):
+        """ Initialize the cache
+
+        Args:
+            policy (type): A BaseCaching subclass, e.g. LRUCache.
+            capacity (int): Most items held.
+            ttl (float): Seconds to keep each item; forever if None.
+            shards (int): Independently locked shards (see
+                ShardedCache); capacity is split between them.
+            max_bytes (int): Most bytes held, as measured by ``sizer``.
+            sizer (callable): Size of an item (see BaseCaching).
+            options: Other arguments of the policy, e.g. aging=True.
+        """
+        if sizer is not None:
+            sizer = functools.partial(self._unwrapped, sizer)
+        self.cache = ShardedCache(policy, shards, capacity, max_bytes,
+                                  sizer, ttl=ttl, **options)
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def get_or_load(self, key, loader, ttl=None):
+        """ The item of ``key``, from ``loader(key)`` on a miss, cached
+            for ``ttl`` seconds if given
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry[0]
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                # A leader may have cached it and landed since the
+                # miss, which was counted already
+                entry = self.cache.peek(key)
+                if entry is not None:
+                    return entry[0]
+                flight = self.flights[key] = Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = loader(key)
+            self.cache.put(key, (flight.value,), ttl)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, key):
+        """ Drop the item of ``key``, if cached
+        """
+        self.cache.discard(key)
+
+    def stats(self):
+        """ Counters of the cache (see ShardedCache.stats)
+        """
+        return self.cache.stats()
+
+    @staticmethod
+    def _unwrapped(sizer, entry):
+        """ Size of the item wrapped in ``entry``
+        """
+        return sizer(entry[0])
+
+
+class AsyncLoadingCache(LoadingCache):
+    """ AsyncLoadingCache is a LoadingCache for coroutines.
+
+        ``get_or_load`` awaits ``loader(key)`` on a miss. Tasks of one
+        event loop missing the same key together share one load; a
+        task that is cancelled while waiting does not cancel it for
+        the others.
+
+        An AsyncLoadingCache belongs to one event loop: its loads in
+        flight are only read and changed from that loop's thread,
+        without a lock. Give every loop (or thread running one) its own
+        cache; the items themselves are in a thread-safe ShardedCache.
+    """
+
+    async def get_or_load(self, key, loader, ttl=None):
+        """ The item of ``key``, from ``await loader(key)`` on a miss,
+            cached for ``ttl`` seconds if given
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry[0]
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._load(key, loader, ttl))
+            self.flights[key] = flight
+            flight.add_done_callback(
+                lambda done: self.flights.pop(key, None))
+        return await asyncio.shield(flight)
+
+    async def _load(self, key, loader, ttl):
+        """ Await ``loader(key)`` and cache its result
+        """
+        value = await loader(key)
+        self.cache.put(key, (value,), ttl)
+        return value
+
+
+def cached(policy=LRUCache, capacity=128, ttl=None, **options):
+    """ Decorator memoizing a function or coroutine function by its
+        arguments, with single-flight loading
+
+        The arguments are those of LoadingCache. The wrapper's
+        ``cache`` attribute is its LoadingCache (an AsyncLoadingCache
+        for coroutine functions), whose ``invalidate(key)`` takes a key
+        from ``make_key(args, kwargs)``.
+    """
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            cache = AsyncLoadingCache(policy, capacity, ttl, **options)
+
+            async def wrapper(*args, **kwargs):
+                return await cache.get_or_load(
+                    make_key(args, kwargs), lambda key: func(*args, **kwargs))
+        else:
+            cache = LoadingCache(policy, capacity, ttl, **options)
+
+            def wrapper(*args, **kwargs):
+                return cache.get_or_load(
+                    make_key(args, kwargs), lambda key: func(*args, **kwargs))
+        wrapper.cache = cache
+        return functools.wraps(func)(wrapper)
+    return decorate
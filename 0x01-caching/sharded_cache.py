@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+ShardedCache module
+"""
+import threading
+
+from base_caching import BaseCaching
+
+
+class ShardedCache():
+    """ ShardedCache makes any BaseCaching policy safe to share between
+        threads.
+
+        Keys are spread by hash over ``shards`` independent caches of
+        the policy, each behind its own lock (lock striping), so
+        threads working on different shards never wait for each
+        other. Each shard evicts on its own, from its share of the
+        budget. With ``shards=1`` this is a cache behind one global
+        lock.
+    """
+
+    def __init__(self, policy, shards=16, max_items=None,
+                 max_bytes=None, sizer=None, **options):
+        """ Initialize the shards
+
+        Args:
+            policy (type): A BaseCaching subclass, e.g. LRUCache.
+            shards (int): Number of independently locked shards; at
+                most ``max_items``, so that each shard holds an item.
+            max_items (int): Most items held in total; defaults to the
+                policy's MAX_ITEMS. Split evenly, the first shards
+                taking one more when it does not divide exactly.
+            max_bytes (int): Most bytes held in total, split the same
+                way.
+            sizer (callable): Size of an item (see BaseCaching).
+            options: Other arguments of the policy, e.g. ttl=60 or
+                aging=True.
+        """
+        assert isinstance(policy, type) and \
+            issubclass(policy, BaseCaching), \
+            "policy must be a BaseCaching subclass"
+        assert isinstance(shards, int) and shards > 0, \
+            "shards must be a positive integer"
+        if max_items is None:
+            max_items = policy.MAX_ITEMS
+        shards = max(min(shards, max_items), 1)
+        self.policy = policy
+        self.shards = []
+        self.locks = []
+        self.counters = []
+        for k in range(shards):
+            cache = policy(
+                self._share(max_items, shards, k),
+                None if max_bytes is None else
+                self._share(max_bytes, shards, k),
+                sizer, **options)
+            counter = {"hits": 0, "misses": 0, "evictions": 0,
+                       "expirations": 0}
+            cache.on_discard = self._counting(counter, "evictions")
+            cache.on_expire = self._counting(counter, "expirations")
+            self.shards.append(cache)
+            self.locks.append(threading.Lock())
+            self.counters.append(counter)
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the shard of ``key``, for ``ttl`` seconds if
+            given.
+        """
+        if key is None or item is None:
+            return
+        k = hash(key) % len(self.shards)
+        with self.locks[k]:
+            self.shards[k].put(key, item, ttl)
+
+    def get(self, key):
+        """ Get an item by key, or None.
+        """
+        if key is None:
+            return None
+        k = hash(key) % len(self.shards)
+        with self.locks[k]:
+            item = self.shards[k].get(key)
+            self.counters[k]["misses" if item is None else "hits"] += 1
+        return item
+
+    def peek(self, key):
+        """ Get an item by key, or None, without counting a hit or a
+            miss (e.g. to look again after a counted miss).
+        """
+        if key is None:
+            return None
+        k = hash(key) % len(self.shards)
+        with self.locks[k]:
+            return self.shards[k].get(key)
+
+    def discard(self, key):
+        """ Remove an item, if cached.
+        """
+        if key is None:
+            return
+        k = hash(key) % len(self.shards)
+        with self.locks[k]:
+            self.shards[k].discard(key)
+
+    def expire(self):
+        """ Drop expired items from every shard; return how many
+        """
+        expired = 0
+        for cache, lock in zip(self.shards, self.locks):
+            with lock:
+                expired += cache.expire()
+        return expired
+
+    def __len__(self):
+        return sum(len(cache.cache_data) for cache in self.shards)
+
+    def stats(self):
+        """ Hits, misses, evictions, expirations, size and bytes of
+            every shard, and their totals with the overall hit ratio
+        """
+        shards = []
+        for cache, lock, counter in zip(self.shards, self.locks,
+                                        self.counters):
+            with lock:
+                shards.append(dict(counter, size=len(cache.cache_data),
+                                   nbytes=cache.nbytes))
+        totals = {name: sum(shard[name] for shard in shards)
+                  for name in ("hits", "misses", "evictions",
+                               "expirations", "size", "nbytes")}
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+        totals["shards"] = shards
+        return totals
+
+    def print_cache(self):
+        """ Print the cache, like BaseCaching.print_cache
+        """
+        items = {}
+        for cache, lock in zip(self.shards, self.locks):
+            with lock:
+                items.update(cache.cache_data)
+        print("Current cache:")
+        for key in sorted(items.keys()):
+            print("{}: {}".format(key, items.get(key)))
+
+    @staticmethod
+    def _counting(counter, name):
+        """ A hook counting calls in ``counter[name]``
+        """
+        def count(key):
+            counter[name] += 1
+        return count
+
+    @staticmethod
+    def _share(total, shards, k):
+        """ Part of ``total`` given to shard ``k`` of ``shards``; the
+            parts add up to ``total``
+        """
+        return total // shards + (k < total % shards)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+TimerWheel module
+"""
+import math
+
+
+class TimerWheel():
+    """ TimerWheel is a hierarchical timing wheel of key deadlines.
+
+        Time advances in ticks of ``resolution`` seconds. Level 0 has
+        one slot per tick for the next ``slots`` ticks; each level
+        above has slots ``slots`` times wider. A key is placed at the
+        lowest level whose span reaches its deadline. When a tick
+        crosses the boundary of a wider slot, that slot's keys move
+        down to narrower ones (a cascade). Scheduling, cancelling and
+        each tick are O(1), and every key cascades at most ``levels``
+        times. Runs of ticks with nothing scheduled below a level are
+        skipped in one step.
+    """
+
+    def __init__(self, resolution=1.0, slots=64, levels=4, now=0.0):
+        """ Initialize an empty wheel at time ``now``
+        """
+        assert resolution > 0, "resolution must be positive"
+        assert slots > 1 and levels > 0, "the wheel needs slots and levels"
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.spans = [slots ** level for level in range(levels + 1)]
+        self.wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.counts = [0] * levels
+        self.due = {}       # key -> deadline tick
+        self.where = {}     # key -> (level, slot)
+        self.tick = int(now // resolution)
+
+    def __len__(self):
+        return len(self.due)
+
+    @property
+    def next_time(self):
+        """ Time at which the next tick is due
+        """
+        return (self.tick + 1) * self.resolution
+
+    def schedule(self, key, deadline):
+        """ Fire ``key`` at the first tick at or after ``deadline``,
+            replacing any earlier schedule
+        """
+        self.cancel(key)
+        tick = max(math.ceil(deadline / self.resolution), self.tick + 1)
+        self.due[key] = tick
+        self._place(key, tick)
+
+    def cancel(self, key):
+        """ Unschedule ``key``, if scheduled
+        """
+        if self.due.pop(key, None) is not None:
+            level, slot = self.where.pop(key)
+            self.wheels[level][slot].discard(key)
+            self.counts[level] -= 1
+
+    def advance(self, now):
+        """ Move to time ``now`` and return the keys that came due
+        """
+        target = int(now // self.resolution)
+        fired = []
+        while self.tick < target:
+            if not self.due:
+                self.tick = target
+                break
+            # Nothing below ``level``: jump to that level's next boundary
+            level = 0
+            while level < self.levels - 1 and not self.counts[level]:
+                level += 1
+            if level:
+                span = self.spans[level]
+                boundary = (self.tick // span + 1) * span
+                if boundary > target:
+                    self.tick = target
+                    break
+                self.tick = boundary - 1
+            self.tick += 1
+            self._cascade()
+            bucket = self.wheels[0][self.tick % self.slots]
+            if bucket:
+                self.counts[0] -= len(bucket)
+                keys = list(bucket)
+                bucket.clear()
+                for key in keys:
+                    if self.due[key] > self.tick:
+                        # Parked beyond a one-level wheel
+                        self._place(key, self.due[key])
+                        continue
+                    del self.due[key]
+                    del self.where[key]
+                    fired.append(key)
+        return fired
+
+    def _cascade(self):
+        """ Move the keys of every wider slot starting at this tick down
+            a level, widest first
+        """
+        for level in range(self.levels - 1, 0, -1):
+            span = self.spans[level]
+            if self.tick % span or not self.counts[level]:
+                continue
+            bucket = self.wheels[level][self.tick // span % self.slots]
+            self.counts[level] -= len(bucket)
+            keys = list(bucket)
+            bucket.clear()
+            for key in keys:
+                self._place(key, self.due[key])
+
+    def _place(self, key, tick):
+        """ Put ``key`` in the slot that covers ``tick``
+        """
+        delta = tick - self.tick
+        level = 0
+        while level < self.levels - 1 and delta >= self.spans[level + 1]:
+            level += 1
+        if delta >= self.spans[level + 1]:
+            # Beyond the wheel: park in the farthest top slot for now
+            tick = self.tick + self.spans[level + 1] - 1
+        slot = tick // self.spans[level] % self.slots
+        self.wheels[level][slot].add(key)
+        self.where[key] = (level, slot)
+        self.counts[level] += 1
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+""" ttl-main """
+LRUCache = __import__('3-lru_cache').LRUCache
+
+now = [0.0]
+my_cache = LRUCache(ttl=10)
+my_cache.clock = lambda: now[0]
+my_cache.on_expire = lambda key: print("EXPIRE: {}".format(key))
+
+my_cache.put("A", "Hello")
+my_cache.put("B", "World", ttl=0.05)
+my_cache.put("C", "Holberton", ttl=500)
+my_cache.put("D", "School", ttl=30 * 86400)
+my_cache.print_cache()
+
+# B is due before the wheel's next tick: get checks its deadline
+now[0] = 0.07
+print(my_cache.get("B"))
+
+# A (default ttl) is dropped by the tick that a put runs
+now[0] = 10.05
+my_cache.put("E", "Battery", ttl=1)
+my_cache.print_cache()
+print(my_cache.get("A"))
+
+# expire() sweeps on demand; E is gone without being looked up
+now[0] = 12
+print(my_cache.expire())
+my_cache.print_cache()
+
+# C cascades down from a wider slot and fires on time
+now[0] = 499.9
+print(my_cache.expire())
+now[0] = 500
+print(my_cache.expire())
+
+# D is beyond the wheel's horizon: parked, then placed again
+now[0] = 29 * 86400
+print(my_cache.expire())
+print(my_cache.get("D"))
+now[0] = 30 * 86400
+print(my_cache.get("D"))
+my_cache.print_cache()